@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from django.core.signals import request_started
+
+        from api_yamdb.db.health import mark_connections
+
+        from . import checks  # noqa: F401
+
+        request_started.connect(mark_connections)
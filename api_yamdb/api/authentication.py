@@ -0,0 +1,75 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from reviews.versions import get_versions, user_scope
+
+USER_CACHE_KEY = 'auth-user:{}:{}'
+
+
+class LRUCache:
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.items[key] = (value, time.monotonic() + self.timeout)
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+local_users = LRUCache(
+    settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TIMEOUT)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    # Пользователь по токену берется из кэша. Ключ включает версию
+    # пользователя, которая увеличивается при каждом его сохранении.
+    # Версии хранятся в общем для процессов кэше (проверка api.W001),
+    # поэтому смена роли или блокировка действуют сразу во всех процессах.
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user '
+                               'identification')
+        version, = get_versions(user_scope(user_id))
+        key = USER_CACHE_KEY.format(user_id, version)
+        user = local_users.get(key)
+        if user is None:
+            user = cache.get(key)
+            if user is None:
+                user = super().get_user(validated_token)
+                cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+            local_users.set(key, user)
+        # Каждый запрос получает свою копию, чтобы изменения объекта
+        # не попадали в кэш процесса.
+        return copy.copy(user)
@@ -0,0 +1,116 @@
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from reviews.bulk import create_objects
+from reviews.models import Category, Genre, Review, Title, User
+from reviews.ratings import update_rating
+from reviews.stats import update_stats
+from reviews.versions import bump_versions_on_commit, reviews_scope
+
+BULK_MAX_ITEMS = 1000
+
+
+def validate_items(serializer_class, data, context=None):
+    if not isinstance(data, list) or not data:
+        raise ValidationError(
+            {'non_field_errors': ['Ожидается непустой список объектов.']})
+    if len(data) > BULK_MAX_ITEMS:
+        raise ValidationError({'non_field_errors': [
+            f'За один запрос можно передать не больше {BULK_MAX_ITEMS} '
+            f'объектов.']})
+    serializers = [
+        serializer_class(data=item, context=context) for item in data]
+    errors = [
+        {} if serializer.is_valid() else dict(serializer.errors)
+        for serializer in serializers
+    ]
+    items = [serializer.validated_data for serializer in serializers]
+    return items, errors
+
+
+def raise_if_errors(errors):
+    if any(errors):
+        raise ValidationError(errors)
+
+
+def bulk_create_titles(items, errors):
+    genre_slugs = {slug for item in items for slug in item.get('genre', ())}
+    category_slugs = {item['category'] for item in items if item}
+    genres = dict(Genre.objects.filter(
+        slug__in=genre_slugs).values_list('slug', 'pk'))
+    categories = dict(Category.objects.filter(
+        slug__in=category_slugs).values_list('slug', 'pk'))
+    for item, item_errors in zip(items, errors):
+        if item_errors:
+            continue
+        unknown = [slug for slug in item['genre'] if slug not in genres]
+        if unknown:
+            item_errors['genre'] = [
+                f'Жанр {slug} не существует.' for slug in unknown]
+        if item['category'] not in categories:
+            item_errors['category'] = [
+                f'Категория {item["category"]} не существует.']
+    raise_if_errors(errors)
+
+    titles = [
+        Title(
+            name=item['name'],
+            year=item['year'],
+            description=item.get('description'),
+            category_id=categories[item['category']]
+        )
+        for item in items
+    ]
+    with transaction.atomic():
+        create_objects(Title, titles)
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title.pk, genre_id=genres[slug])
+            for title, item in zip(titles, items)
+            for slug in set(item['genre'])
+        )
+        bump_versions_on_commit(Title._meta.model_name)
+    return titles
+
+
+def bulk_create_reviews(title, items, errors):
+    usernames = {item['author'] for item in items if item}
+    # Авторы загружаются целиком: они нужны сериализатору ответа.
+    authors = {
+        user.username: user
+        for user in User.objects.filter(username__in=usernames)
+    }
+    reviewed = set(Review.objects.filter(
+        title=title, author__in=authors.values()
+    ).values_list('author_id', flat=True))
+    for item, item_errors in zip(items, errors):
+        if item_errors:
+            continue
+        author = authors.get(item['author'])
+        if author is None:
+            item_errors['author'] = [
+                f'Пользователь {item["author"]} не существует.']
+            continue
+        if author.pk in reviewed:
+            item_errors['author'] = [
+                'На каждое произведение можно добавить только один отзыв!']
+        reviewed.add(author.pk)
+    raise_if_errors(errors)
+
+    reviews = [
+        Review(
+            title=title,
+            author=authors[item['author']],
+            text=item['text'],
+            score=item['score']
+        )
+        for item in items
+    ]
+    with transaction.atomic():
+        if not create_objects(Review, reviews):
+            scores = [review.score for review in reviews]
+            update_rating(title.pk, sum(scores), len(scores))
+            update_stats(
+                title.pk, added=scores,
+                latest=max(review.pub_date for review in reviews))
+            bump_versions_on_commit(
+                Review._meta.model_name, reviews_scope(title.pk))
+    return reviews
@@ -0,0 +1,105 @@
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from reviews.versions import get_versions
+
+from .metrics import CACHE_HIT, CACHE_MISS, cache_results, record_cache_result
+
+RESPONSE_KEY = 'api-cache:response:{}'
+
+logger = logging.getLogger(__name__)
+
+
+def _count(result):
+    # Счетчики пишутся в файл метрик процесса, а не в общий кэш:
+    # попадание не должно ничего записывать в кэш.
+    try:
+        record_cache_result(result)
+    except OSError:
+        logger.exception('Не удалось записать счетчик кэша.')
+
+
+def get_cache_stats():
+    results = cache_results(settings.METRICS_DIR)
+    return {'hits': results[CACHE_HIT], 'misses': results[CACHE_MISS]}
+
+
+class CachedResponseMixin:
+    # Имена моделей, от данных которых зависит ответ представления.
+    cache_dependencies = ()
+    cache_timeout = settings.API_CACHE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
+
+    def is_cacheable(self, request):
+        return (request.method in SAFE_METHODS
+                and not request.user.is_authenticated)
+
+    def get_cache_dependencies(self):
+        return self.cache_dependencies
+
+    def get_cache_key(self, request):
+        versions = get_versions(*self.get_cache_dependencies())
+        raw_key = ':'.join(
+            [request.get_host(), request.get_full_path()]
+            + [str(version) for version in versions]
+        )
+        return RESPONSE_KEY.format(hashlib.md5(raw_key.encode()).hexdigest())
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not self.is_cacheable(request):
+            return handler(request, *args, **kwargs)
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            _count(CACHE_HIT)
+            return Response(data, headers={'X-Cache': 'HIT'})
+        _count(CACHE_MISS)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class ConditionalGetMixin:
+    cache_dependencies = ()
+
+    def get_cache_dependencies(self):
+        return self.cache_dependencies
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return handler(request, *args, **kwargs)
+        # Last-Modified не отдается: версии меняются чаще раза в секунду,
+        # и запись в ту же секунду не была бы видна по If-Modified-Since.
+        versions = get_versions(*self.get_cache_dependencies())
+        raw_etag = ':'.join(
+            [request.get_full_path()] + [str(version) for version in versions])
+        etag = quote_etag(hashlib.md5(raw_etag.encode()).hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+        return response
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    # Версии данных и пользователей хранятся в кэше: без общего для
+    # процессов бэкенда запись в одном процессе не видна в других.
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        f'Кэш {backend} не общий для процессов: изменения из других '
+        'воркеров и management-команд не сбросят кэш ответов и '
+        'пользователей.',
+        hint='Используйте FileBasedCache, Redis или Memcached.',
+        id='api.W001',
+    )]
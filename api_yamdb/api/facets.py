@@ -0,0 +1,28 @@
+from django.db.models import Count, ExpressionWrapper, F, IntegerField, Q
+from reviews.models import Category, Genre, Title
+
+
+def title_facets(queryset, year_bucket=1):
+    titles = queryset.order_by().values('pk')
+    genres = Genre.objects.annotate(
+        count=Count('title', filter=Q(title__in=titles))
+    ).values('slug', 'name', 'count')
+    categories = Category.objects.annotate(
+        count=Count('titles', filter=Q(titles__in=titles))
+    ).values('slug', 'name', 'count')
+    bucket = F('year')
+    if year_bucket > 1:
+        bucket = ExpressionWrapper(
+            F('year') / year_bucket * year_bucket,
+            output_field=IntegerField()
+        )
+    years = Title.objects.filter(pk__in=titles).annotate(
+        bucket=bucket
+    ).order_by('bucket').values('bucket').annotate(count=Count('pk'))
+    return {
+        'genre': list(genres),
+        'category': list(categories),
+        'year': [
+            {'year': row['bucket'], 'count': row['count']} for row in years
+        ],
+    }
@@ -1,5 +1,24 @@
+from django.db.models import Exists, OuterRef
 from django_filters import FilterSet, filters
+from rest_framework.filters import BaseFilterBackend
 from reviews.models import Title
+from reviews.search import search_titles
+
+MATCH_ANY = 'any'
+MATCH_ALL = 'all'
+MATCH_CHOICES = (
+    (MATCH_ANY, MATCH_ANY),
+    (MATCH_ALL, MATCH_ALL),
+)
+
+
+def split_slugs(value):
+    return [slug.strip() for slug in value.split(',') if slug.strip()]
+
+
+def genre_exists(**lookups):
+    return Exists(Title.genre.through.objects.filter(
+        title_id=OuterRef('pk'), **lookups))
 
 
 class TitleFilter(FilterSet):
@@ -7,15 +26,45 @@ class TitleFilter(FilterSet):
         field_name='name',
         lookup_expr='icontains'
     )
-    category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
+    genre_match = filters.ChoiceFilter(
+        choices=MATCH_CHOICES,
+        method='filter_match'
     )
-    genre = filters.CharFilter(
-        field_name='genre__slug',
+    category_contains = filters.CharFilter(
+        field_name='category__slug',
         lookup_expr='icontains'
     )
+    genre_contains = filters.CharFilter(method='filter_genre_contains')
 
     class Meta:
         model = Title
         fields = ('name', 'year', 'genre', 'category',)
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category__slug__in=split_slugs(value))
+
+    def filter_genre(self, queryset, name, value):
+        slugs = split_slugs(value)
+        if self.form.cleaned_data.get('genre_match') != MATCH_ALL:
+            return queryset.filter(genre_exists(genre__slug__in=slugs))
+        for slug in slugs:
+            queryset = queryset.filter(genre_exists(genre__slug=slug))
+        return queryset
+
+    def filter_match(self, queryset, name, value):
+        return queryset
+
+    def filter_genre_contains(self, queryset, name, value):
+        return queryset.filter(genre_exists(genre__slug__icontains=value))
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        return search_titles(queryset, text)
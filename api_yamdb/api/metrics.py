@@ -0,0 +1,304 @@
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.generic import View
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+FILE_PATTERN = 'metrics-*.db'
+INITIAL_FILE_SIZE = 64 * 1024
+UNMATCHED_ROUTE = 'unmatched'
+OTHER_METHOD = 'other'
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+INF = '+Inf'
+
+REQUESTS = 'http_requests_total'
+DURATION = 'http_request_duration_seconds'
+DB_DURATION = 'http_request_db_duration_seconds'
+DB_QUERIES = 'http_request_db_queries_total'
+CACHE_REQUESTS = 'api_cache_requests_total'
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+METRICS = {
+    REQUESTS: ('counter', 'Количество запросов по маршрутам и статусам.'),
+    DURATION: ('histogram', 'Время обработки запроса в секундах.'),
+    DB_DURATION: ('histogram', 'Время SQL-запросов за один запрос '
+                               'в секундах.'),
+    DB_QUERIES: ('counter', 'Количество SQL-запросов.'),
+    CACHE_REQUESTS: ('counter', 'Попадания и промахи кэша ответов API.'),
+}
+
+HEADER = struct.Struct('<Q')
+KEY_LENGTH = struct.Struct('<I')
+VALUE = struct.Struct('<d')
+
+logger = logging.getLogger(__name__)
+
+
+def aligned(position):
+    return (position + VALUE.size - 1) // VALUE.size * VALUE.size
+
+
+def read_entries(data, used):
+    # Файл: размер занятой части, затем записи "длина ключа, ключ,
+    # значение double", выровненные по 8 байт.
+    position = HEADER.size
+    while position < used:
+        length, = KEY_LENGTH.unpack_from(data, position)
+        key_start = position + KEY_LENGTH.size
+        key = bytes(data[key_start:key_start + length]).decode()
+        value_position = aligned(key_start + length)
+        value, = VALUE.unpack_from(data, value_position)
+        yield key, value, value_position
+        position = value_position + VALUE.size
+
+
+class MetricsFile:
+    # Значения метрик одного процесса в отображенном в память файле.
+    # Каждый процесс пишет только в свой файл, поэтому между процессами
+    # блокировки не нужны; другие процессы только читают файлы.
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self.size = os.fstat(self.fd).st_size
+        if self.size < INITIAL_FILE_SIZE:
+            self.size = INITIAL_FILE_SIZE
+            os.ftruncate(self.fd, self.size)
+        self.mmap = mmap.mmap(self.fd, self.size)
+        self.used, = HEADER.unpack_from(self.mmap, 0)
+        if not self.used:
+            self.used = HEADER.size
+            HEADER.pack_into(self.mmap, 0, self.used)
+        self.positions = {
+            key: position
+            for key, _, position in read_entries(self.mmap, self.used)
+        }
+
+    def increment_many(self, samples):
+        with self.lock:
+            for key, amount in samples:
+                position = self.positions.get(key)
+                if position is None:
+                    position = self.add(key)
+                value, = VALUE.unpack_from(self.mmap, position)
+                VALUE.pack_into(self.mmap, position, value + amount)
+
+    def add(self, key):
+        encoded = key.encode()
+        key_start = self.used + KEY_LENGTH.size
+        position = aligned(key_start + len(encoded))
+        end = position + VALUE.size
+        while end > self.size:
+            self.grow()
+        KEY_LENGTH.pack_into(self.mmap, self.used, len(encoded))
+        self.mmap[key_start:key_start + len(encoded)] = encoded
+        VALUE.pack_into(self.mmap, position, 0.0)
+        # Размер обновляется последним, чтобы читатели не видели
+        # недописанную запись.
+        HEADER.pack_into(self.mmap, 0, end)
+        self.used = end
+        self.positions[key] = position
+        return position
+
+    def grow(self):
+        self.size *= 2
+        os.ftruncate(self.fd, self.size)
+        self.mmap.close()
+        self.mmap = mmap.mmap(self.fd, self.size)
+
+    def close(self):
+        self.mmap.close()
+        os.close(self.fd)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    # Файл открывается заново в дочернем процессе после fork
+    # и при смене каталога.
+    global _store
+    directory = settings.METRICS_DIR
+    store = _store
+    if (store is None or store.pid != os.getpid()
+            or store.directory != directory):
+        with _store_lock:
+            store = _store
+            if (store is None or store.pid != os.getpid()
+                    or store.directory != directory):
+                os.makedirs(directory, exist_ok=True)
+                store = MetricsFile(
+                    os.path.join(directory, f'metrics-{os.getpid()}.db'))
+                store.pid = os.getpid()
+                store.directory = directory
+                _store = store
+    return store
+
+
+def clear_metrics(directory):
+    for path in glob.glob(os.path.join(directory, FILE_PATTERN)):
+        os.remove(path)
+
+
+def sample_key(family, sample, **labels):
+    return json.dumps([family, sample, sorted(labels.items())])
+
+
+def histogram_samples(family, value, **labels):
+    index = bisect_left(DURATION_BUCKETS, value)
+    bound = DURATION_BUCKETS[index] if index < len(DURATION_BUCKETS) else INF
+    return [
+        (sample_key(family, f'{family}_bucket', le=str(bound), **labels), 1),
+        (sample_key(family, f'{family}_sum', **labels), value),
+        (sample_key(family, f'{family}_count', **labels), 1),
+    ]
+
+
+def record_request(route, method, status, duration, db_duration, queries):
+    get_store().increment_many([
+        (sample_key(REQUESTS, REQUESTS, route=route, method=method,
+                    status=str(status)), 1),
+        *histogram_samples(DURATION, duration, route=route, method=method),
+        *histogram_samples(DB_DURATION, db_duration, route=route),
+        (sample_key(DB_QUERIES, DB_QUERIES, route=route), queries),
+    ])
+
+
+def record_cache_result(result):
+    get_store().increment_many(
+        [(sample_key(CACHE_REQUESTS, CACHE_REQUESTS, result=result), 1)])
+
+
+def cache_results(directory):
+    totals = collect(directory)
+    return {
+        result: int(totals.get(sample_key(
+            CACHE_REQUESTS, CACHE_REQUESTS, result=result), 0))
+        for result in (CACHE_HIT, CACHE_MISS)
+    }
+
+
+def collect(directory):
+    totals = defaultdict(float)
+    for path in glob.glob(os.path.join(directory, FILE_PATTERN)):
+        with open(path, 'rb') as file:
+            data = file.read()
+        if len(data) < HEADER.size:
+            continue
+        used = min(HEADER.unpack_from(data, 0)[0], len(data))
+        for key, value, _ in read_entries(data, used):
+            totals[key] += value
+    return totals
+
+
+def escape(value):
+    return (value.replace('\\', r'\\').replace('\n', r'\n')
+            .replace('"', r'\"'))
+
+
+def format_sample(sample, labels, value):
+    if labels:
+        sample += '{' + ','.join(
+            f'{name}="{escape(label)}"' for name, label in labels) + '}'
+    return f'{sample} {value!r}'
+
+
+def histogram_lines(family, samples):
+    # В файлах хранится число наблюдений в каждом интервале,
+    # Prometheus ожидает накопленные значения.
+    buckets = defaultdict(dict)
+    lines = []
+    for sample, labels, value in samples:
+        if sample.endswith('_bucket'):
+            le = dict(labels).pop('le')
+            group = tuple(label for label in labels if label[0] != 'le')
+            buckets[group][le] = value
+    for labels in sorted(buckets):
+        total = 0.0
+        for bound in [str(bound) for bound in DURATION_BUCKETS] + [INF]:
+            total += buckets[labels].get(bound, 0.0)
+            lines.append(format_sample(
+                f'{family}_bucket', sorted(labels + (('le', bound),)),
+                total))
+    lines += sorted(
+        format_sample(sample, labels, value)
+        for sample, labels, value in samples
+        if not sample.endswith('_bucket')
+    )
+    return lines
+
+
+def render_metrics(totals):
+    families = defaultdict(list)
+    for key, value in totals.items():
+        family, sample, labels = json.loads(key)
+        families[family].append(
+            (sample, [tuple(label) for label in labels], value))
+    lines = []
+    for family in sorted(families):
+        kind, help_text = METRICS[family]
+        lines.append(f'# HELP {family} {help_text}')
+        lines.append(f'# TYPE {family} {kind}')
+        if kind == 'histogram':
+            lines += histogram_lines(family, families[family])
+        else:
+            lines += sorted(
+                format_sample(sample, labels, value)
+                for sample, labels, value in families[family]
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    return HttpResponse(
+        render_metrics(collect(settings.METRICS_DIR)),
+        content_type=CONTENT_TYPE
+    )
+
+
+def method_label(method):
+    # Произвольные методы не должны порождать новые серии метрик.
+    if method.lower() in View.http_method_names:
+        return method
+    return OTHER_METHOD
+
+
+class MetricsMiddleware:
+    # Количество, время и время SQL-запросов по имени маршрута DRF.
+    # Время SQL берется у RequestTimingMiddleware.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        timing = getattr(request, 'timing', None)
+        try:
+            record_request(
+                route=match.view_name if match else UNMATCHED_ROUTE,
+                method=method_label(request.method),
+                status=response.status_code,
+                duration=duration,
+                db_duration=timing.db_time if timing else 0.0,
+                queries=timing.queries if timing else 0
+            )
+        except OSError:
+            logger.exception('Не удалось записать метрики запроса.')
+        return response
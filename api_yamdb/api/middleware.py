@@ -0,0 +1,176 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+
+SERVER_TIMING_HEADER = 'Server-Timing'
+MAX_SQL_LENGTH = 500
+
+slow_requests = logging.getLogger('api.slow_requests')
+
+current_timing = ContextVar('current_timing', default=None)
+
+
+class RequestTiming:
+    # Счетчик SQL-запросов запроса. Запросы группируются по тексту SQL
+    # без параметров, поэтому N+1 виден как один часто повторяющийся запрос.
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = {}
+        self.render_started = None
+        self.render_db_time = 0.0
+        self.render_time = 0.0
+        self.serializing = False
+        self.serialize_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            statement = self.statements.get(sql)
+            if statement is None:
+                self.statements[sql] = [1, elapsed]
+            else:
+                statement[0] += 1
+                statement[1] += elapsed
+
+    def start_render(self):
+        self.render_started = time.perf_counter()
+        self.render_db_time = self.db_time
+
+    def finish_render(self, response):
+        self.render_time = time.perf_counter() - self.render_started
+        self.render_db_time = self.db_time - self.render_db_time
+
+    @contextmanager
+    def serialization(self):
+        # Учитывается только внешний вызов serializer.data, без времени
+        # SQL-запросов, сделанных во время сериализации.
+        if self.serializing:
+            yield
+            return
+        self.serializing = True
+        started = time.perf_counter()
+        db_time = self.db_time
+        try:
+            yield
+        finally:
+            self.serializing = False
+            self.serialize_time += (time.perf_counter() - started
+                                    - (self.db_time - db_time))
+
+    def top_statements(self, limit):
+        statements = sorted(
+            self.statements.items(),
+            key=lambda item: (-item[1][0], -item[1][1])
+        )[:limit]
+        return [
+            {
+                'sql': sql[:MAX_SQL_LENGTH],
+                'count': count,
+                'time_ms': round(duration * 1000, 2),
+            }
+            for sql, (count, duration) in statements
+        ]
+
+
+@lru_cache(maxsize=None)
+def timed_serializer_class(serializer_class):
+    class TimedSerializer(serializer_class):
+
+        @property
+        def data(self):
+            timing = current_timing.get()
+            if timing is None:
+                return super().data
+            with timing.serialization():
+                return super().data
+
+    TimedSerializer.__name__ = serializer_class.__name__
+    TimedSerializer.__qualname__ = serializer_class.__qualname__
+    return TimedSerializer
+
+
+def timed_serializer(serializer):
+    # Класс уже созданного сериализатора подменяется подклассом с
+    # замером serializer.data, так что замер работает и для many=True.
+    serializer.__class__ = timed_serializer_class(type(serializer))
+    return serializer
+
+
+class RequestTimingMiddleware:
+    # Время SQL-запросов, сериализации и отрисовки ответа для каждого
+    # запроса в заголовке Server-Timing; медленные запросы пишутся в лог.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.timing = timing = RequestTiming()
+        token = current_timing.set(timing)
+        try:
+            with connection.execute_wrapper(timing):
+                response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        total = time.perf_counter() - timing.started
+        # Время отрисовки не включает запросы к БД, сделанные во время нее:
+        # они учтены в db.
+        render = timing.render_time - timing.render_db_time
+        serialize = timing.serialize_time
+        app = max(total - timing.db_time - render - serialize, 0.0)
+        if response.streaming:
+            # Тело потокового ответа формируется уже после выхода из
+            # middleware, и его запросы и сериализация сюда не попадают.
+            response[SERVER_TIMING_HEADER] = (
+                f'total;dur={total * 1000:.2f};desc="before streaming"')
+        else:
+            response[SERVER_TIMING_HEADER] = ', '.join((
+                f'db;dur={timing.db_time * 1000:.2f};'
+                f'desc="{timing.queries} queries"',
+                f'app;dur={app * 1000:.2f}',
+                f'serialize;dur={serialize * 1000:.2f}',
+                f'render;dur={render * 1000:.2f}',
+                f'total;dur={total * 1000:.2f}',
+            ))
+        if total * 1000 >= settings.SLOW_REQUEST_THRESHOLD:
+            self.log_slow_request(
+                request, response, timing, total, serialize, render)
+        return response
+
+    def process_template_response(self, request, response):
+        timing = getattr(request, 'timing', None)
+        if timing is not None:
+            timing.start_render()
+            response.add_post_render_callback(timing.finish_render)
+        return response
+
+    def log_slow_request(self, request, response, timing, total, serialize,
+                         render):
+        match = request.resolver_match
+        slow_requests.warning(json.dumps({
+            'method': request.method,
+            'path': request.get_full_path(),
+            'route': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(timing.db_time * 1000, 2),
+            'queries': timing.queries,
+            'serialize_ms': round(serialize * 1000, 2),
+            'render_ms': round(render * 1000, 2),
+            'streaming': response.streaming,
+            'top_queries': timing.top_statements(
+                settings.SLOW_REQUEST_TOP_QUERIES),
+        }, ensure_ascii=False))
@@ -1,4 +1,12 @@
+from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from rest_framework import mixins, viewsets
+from rest_framework.exceptions import ValidationError
+
+from .middleware import timed_serializer
+from .pagination import KeysetPagination
+
+CURSOR_PAGINATION = 'cursor'
 
 
 class ListCreateDestroyViewSet(mixins.ListModelMixin,
@@ -6,3 +14,66 @@ class ListCreateDestroyViewSet(mixins.ListModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
     pass
+
+
+class KeysetPaginationMixin:
+    # Последним полем порядка должен быть уникальный ключ.
+    keyset_ordering = ('id',)
+    keyset_pagination_class = KeysetPagination
+    pagination_query_param = 'pagination'
+    # Параметры, задающие свой порядок выдачи, который курсор не сохраняет.
+    keyset_excluded_params = ()
+    keyset_excluded_message = (
+        'Параметр нельзя совмещать с pagination=cursor: курсор не '
+        'сохраняет порядок выдачи. Используйте постраничную выдачу.')
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and (
+            self.pagination_class is self.keyset_pagination_class
+            or self.request.query_params.get(
+                self.pagination_query_param) == CURSOR_PAGINATION
+            or KeysetPagination.cursor_query_param in self.request.query_params
+        ):
+            self._paginator = self.keyset_pagination_class()
+        return super().paginator
+
+    def paginate_queryset(self, queryset):
+        if isinstance(self.paginator, self.keyset_pagination_class):
+            excluded = [
+                param for param in self.keyset_excluded_params
+                if self.request.query_params.get(param)
+            ]
+            if excluded:
+                raise ValidationError({
+                    param: [self.keyset_excluded_message]
+                    for param in excluded
+                })
+        return super().paginate_queryset(queryset)
+
+
+class NestedResourceMixin:
+    # Родительский объект из URL загружается один раз за запрос и
+    # передается сериализатору в контексте под именем parent_context_name.
+    parent_model = None
+    parent_lookups = {}
+    parent_context_name = 'parent'
+
+    @cached_property
+    def parent_object(self):
+        return get_object_or_404(self.parent_model, **{
+            field: self.kwargs.get(kwarg)
+            for field, kwarg in self.parent_lookups.items()
+        })
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context[self.parent_context_name] = self.parent_object
+        return context
+
+
+class SerializationTimingMixin:
+    # Время serializer.data попадает в Server-Timing как serialize.
+
+    def get_serializer(self, *args, **kwargs):
+        return timed_serializer(super().get_serializer(*args, **kwargs))
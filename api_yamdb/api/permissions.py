@@ -27,3 +27,19 @@ class IsAdminUser(BasePermission):
 
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.is_admin
+
+
+class IsAdminOrPartner(BasePermission):
+    message = 'У вас недостаточно прав для выполнения данного действия'
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and (
+            request.user.is_admin or request.user.is_partner)
+
+
+class IsAdminOrModerator(BasePermission):
+    message = 'У вас недостаточно прав для выполнения данного действия'
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and (
+            request.user.is_admin or request.user.is_moderator)
@@ -0,0 +1,140 @@
+import cProfile
+import itertools
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.urls import Resolver404, resolve
+from rest_framework.exceptions import AuthenticationFailed
+
+from .authentication import CachedJWTAuthentication
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_QUERY_PARAM = 'profile'
+PROFILE_FILE_HEADER = 'X-Profile-File'
+CPROFILE = 'cprofile'
+SAMPLING = 'sampling'
+EXTENSIONS = {CPROFILE: 'prof', SAMPLING: 'collapsed'}
+UNMATCHED_ROUTE = 'unmatched'
+
+# В процессе профилируется не больше одного запроса одновременно.
+profiling_lock = threading.Lock()
+profile_numbers = itertools.count(1)
+
+
+class StackSampler:
+    # Стеки профилируемого потока снимаются с заданным интервалом
+    # и сохраняются в свернутом виде ("a;b;c количество"), который
+    # принимают flamegraph.pl и speedscope.
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def runcall(self, func, *args):
+        sampler = threading.Thread(
+            target=self.sample, args=(threading.get_ident(),), daemon=True)
+        sampler.start()
+        try:
+            return func(*args)
+        finally:
+            self.stopped.set()
+            sampler.join()
+
+    def sample(self, thread_id):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f'{code.co_name} '
+                    f'({code.co_filename}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def dump_stats(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f'{stack} {count}\n')
+
+
+def make_profiler():
+    if settings.PROFILING_MODE == SAMPLING:
+        return StackSampler(settings.PROFILING_SAMPLING_INTERVAL)
+    return cProfile.Profile()
+
+
+def get_route(request):
+    try:
+        return resolve(request.path_info).view_name
+    except Resolver404:
+        return UNMATCHED_ROUTE
+
+
+def is_admin(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            result = CachedJWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        if result is None:
+            return False
+        user = result[0]
+    return user.is_admin
+
+
+class ProfilingMiddleware:
+    # Запрос выполняется под профилировщиком, если администратор
+    # передал заголовок X-Profile или параметр ?profile=1, либо если
+    # запрос попал в случайную выборку для своего маршрута.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = self.is_requested(request)
+        if not requested and not self.is_sampled(request):
+            return self.get_response(request)
+        if not profiling_lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            profiler = make_profiler()
+            response = profiler.runcall(self.get_response, request)
+            filename = self.save(profiler, request)
+        finally:
+            profiling_lock.release()
+        if requested:
+            response[PROFILE_FILE_HEADER] = filename
+        return response
+
+    def is_requested(self, request):
+        return ((PROFILE_HEADER in request.META
+                 or PROFILE_QUERY_PARAM in request.GET)
+                and is_admin(request))
+
+    def is_sampled(self, request):
+        rates = settings.PROFILING_ROUTE_SAMPLE_RATES
+        if not rates and settings.PROFILING_SAMPLE_RATE <= 0:
+            return False
+        rate = rates.get(get_route(request), settings.PROFILING_SAMPLE_RATE)
+        return random.random() < rate
+
+    def save(self, profiler, request):
+        match = request.resolver_match
+        route = re.sub(
+            r'[^\w.-]', '_', match.view_name if match else UNMATCHED_ROUTE)
+        extension = EXTENSIONS.get(settings.PROFILING_MODE, 'prof')
+        filename = (f'{int(time.time() * 1000)}-{route}-{request.method}-'
+                    f'{os.getpid()}-{next(profile_numbers)}.{extension}')
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(settings.PROFILING_DIR, filename))
+        return filename
@@ -2,9 +2,33 @@ from django.contrib.auth.tokens import default_token_generator
 from django.shortcuts import get_object_or_404
 from rest_framework.relations import SlugRelatedField
 from rest_framework.serializers import (CharField, CurrentUserDefault,
-                                        IntegerField, ModelSerializer,
-                                        Serializer, SlugField, ValidationError)
-from reviews.models import Category, Comment, Genre, Review, Title, User
+                                        IntegerField, ListField,
+                                        ModelSerializer, Serializer,
+                                        SerializerMethodField, SlugField,
+                                        ValidationError)
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleRanking, TitleStats, User)
+from reviews.stats import SCORES, score_field
+
+DUPLICATE_REVIEW_MESSAGE = ('На каждое произведение Вы можете добавить '
+                            'только один отзыв!')
+
+
+class BulkReviewSerializer(ModelSerializer):
+    author = CharField(max_length=150)
+
+    class Meta:
+        model = Review
+        fields = ('author', 'text', 'score',)
+
+
+class BulkTitleSerializer(ModelSerializer):
+    genre = ListField(child=SlugField(max_length=50), allow_empty=False)
+    category = SlugField(max_length=50)
+
+    class Meta:
+        model = Title
+        fields = ('name', 'year', 'description', 'genre', 'category',)
 
 
 class CategorySerializer(ModelSerializer):
@@ -51,7 +75,7 @@ class GenreSerializer(ModelSerializer):
 class ListRetrieveTitleSerializer(ModelSerializer):
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
-    rating = IntegerField(source='reviews__score__avg', read_only=True)
+    rating = IntegerField(read_only=True)
 
     class Meta:
         model = Title
@@ -70,16 +94,6 @@ class ReviewSerializer(ModelSerializer):
         default=CurrentUserDefault()
     )
 
-    def validate(self, data):
-        author = self.context['request'].user
-        title = get_object_or_404(
-            Title, pk=self.context['view'].kwargs.get('title_id'))
-        if self.context['request'].method == 'POST':
-            if Review.objects.filter(title=title, author=author).exists():
-                raise ValidationError('На каждое произведение Вы можете '
-                                      'добавить только один отзыв!')
-        return data
-
     class Meta:
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date', 'title',)
@@ -97,6 +111,28 @@ class SignUpSerializer(ModelSerializer):
         fields = ('email', 'username')
 
 
+class TitleRankingSerializer(ModelSerializer):
+    title = ListRetrieveTitleSerializer()
+
+    class Meta:
+        model = TitleRanking
+        fields = ('position', 'score', 'title',)
+
+
+class TitleStatsSerializer(ModelSerializer):
+    histogram = SerializerMethodField()
+
+    class Meta:
+        model = TitleStats
+        fields = ('title', 'review_count', 'latest_review_at', 'histogram',)
+
+    def get_histogram(self, obj):
+        return [
+            {'score': score, 'count': getattr(obj, score_field(score))}
+            for score in SCORES
+        ]
+
+
 class TokenSerializer(Serializer):
     confirmation_code = CharField(required=True, max_length=50)
     username = CharField(required=True, max_length=150)
@@ -1,8 +1,9 @@
 from django.urls import include, path
 from rest_framework import routers
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, SignUp, TitleViewSet, Token, UserViewSet)
+from .views import (CacheStats, CategoryViewSet, CommentViewSet, DatabaseStats,
+                    GenreViewSet, ReviewViewSet, SignUp, TitleViewSet, Token,
+                    UserViewSet)
 
 router_v1 = routers.DefaultRouter()
 router_v1.register(
@@ -40,4 +41,6 @@ urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/signup/', SignUp.as_view(), name='signup'),
     path('v1/auth/token/', Token.as_view(), name='get_token'),
+    path('v1/cache/stats/', CacheStats.as_view(), name='cache_stats'),
+    path('v1/db/stats/', DatabaseStats.as_view(), name='db_stats'),
 ]
@@ -1,80 +1,161 @@
+import json
+from functools import partial
+
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, connections, transaction
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, status, viewsets
+from rest_framework import filters, generics, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.models import (Category, Genre, Review, Title, TitleRanking,
+                            TitleStats, User)
+from reviews.outbox import enqueue_email
+from reviews.versions import comments_scope, reviews_scope
 
+from api_yamdb.db.pool import pool_stats
 from api_yamdb.settings import ADMIN_EMAIL
 
-from .filters import TitleFilter
-from .mixins import ListCreateDestroyViewSet
+from .bulk import bulk_create_reviews, bulk_create_titles, validate_items
+from .cache import CachedResponseMixin, ConditionalGetMixin, get_cache_stats
+from .facets import title_facets
+from .filters import TitleFilter, TitleSearchFilter
+from .middleware import timed_serializer
+from .mixins import (KeysetPaginationMixin, ListCreateDestroyViewSet,
+                     NestedResourceMixin, SerializationTimingMixin)
 from .permissions import (AdminOrReadOnly, AuthorAdminModeratorOrReadOnly,
-                          IsAdminUser)
-from .serializers import (CategorySerializer, CommentSerializer,
+                          IsAdminOrModerator, IsAdminOrPartner, IsAdminUser)
+from .serializers import (DUPLICATE_REVIEW_MESSAGE, BulkReviewSerializer,
+                          BulkTitleSerializer, CategorySerializer,
+                          CommentSerializer,
                           CreateUpdateDestroyTitleSerializer, GenreSerializer,
                           ListRetrieveTitleSerializer, ReviewSerializer,
-                          SignUpSerializer, TokenSerializer,
+                          SignUpSerializer, TitleRankingSerializer,
+                          TitleStatsSerializer, TokenSerializer,
                           UserProfileSerializer, UserSerializer)
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CacheStats(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(get_cache_stats(), status=status.HTTP_200_OK)
+
+
+class DatabaseStats(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        # Статистика пула относится к процессу, обработавшему запрос.
+        return Response({
+            connection.alias: {
+                'vendor': connection.vendor,
+                'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+                'health_checks': bool(
+                    connection.settings_dict.get('CONN_HEALTH_CHECKS')),
+                'pool': pool_stats(connection.alias),
+            }
+            for connection in connections.all()
+        }, status=status.HTTP_200_OK)
+
+
+class CategoryViewSet(ConditionalGetMixin, CachedResponseMixin,
+                      SerializationTimingMixin, ListCreateDestroyViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (AdminOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_dependencies = ('category',)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, KeysetPaginationMixin,
+                     NestedResourceMixin, SerializationTimingMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (AuthorAdminModeratorOrReadOnly,)
+    keyset_ordering = ('pub_date', 'id')
+    parent_model = Review
+    parent_lookups = {'pk': 'review_id', 'title': 'title_id'}
+    parent_context_name = 'review'
+
+    def get_cache_dependencies(self):
+        return (comments_scope(self.kwargs.get('review_id')), 'comment')
 
     @property
     def selected_review(self):
-        return get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title=self.kwargs.get('title_id')
-        )
+        return self.parent_object
 
     def get_queryset(self):
-        return self.selected_review.comments.all()
+        return self.selected_review.comments.select_related('author')
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.selected_review)
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(ConditionalGetMixin, CachedResponseMixin,
+                   SerializationTimingMixin, ListCreateDestroyViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (AdminOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_dependencies = ('genre',)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, KeysetPaginationMixin,
+                    NestedResourceMixin, SerializationTimingMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (AuthorAdminModeratorOrReadOnly,)
+    keyset_ordering = ('pub_date', 'id')
+    parent_model = Title
+    parent_lookups = {'pk': 'title_id'}
+    parent_context_name = 'title'
+
+    def get_cache_dependencies(self):
+        return (reviews_scope(self.kwargs.get('title_id')), 'title')
 
     @property
     def selected_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        return self.parent_object
 
     def get_queryset(self):
-        return self.selected_title.reviews.all()
+        return self.selected_title.reviews.select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.selected_title)
+        # Повторный отзыв отсекает ограничение unique_review в БД.
+        try:
+            serializer.save(
+                author=self.request.user, title=self.selected_title)
+        except IntegrityError:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW_MESSAGE]
+            })
+
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[IsAdminOrModerator],
+        url_path='bulk',
+    )
+    def bulk(self, request, title_id=None):
+        title = self.selected_title
+        items, errors = validate_items(BulkReviewSerializer, request.data)
+        reviews = bulk_create_reviews(title, items, errors)
+        for review in reviews:
+            review.title = title
+        serializer = self.get_serializer(reviews, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
 class SignUp(APIView):
@@ -83,31 +164,146 @@ class SignUp(APIView):
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        new_user = serializer.save()
-        token = default_token_generator.make_token(new_user)
-        send_mail(
-            'Your token has created:',
-            f'{new_user.username}: {token}',
-            ADMIN_EMAIL,
-            [new_user.email],
-            fail_silently=False,
-        )
+        with transaction.atomic():
+            new_user = serializer.save()
+            token = default_token_generator.make_token(new_user)
+            enqueue_email(
+                'Your token has created:',
+                f'{new_user.username}: {token}',
+                new_user.email,
+                ADMIN_EMAIL
+            )
         return Response(
             serializer.data, status=status.HTTP_200_OK)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(
-        Avg('reviews__score')).order_by('name')
+class TitleViewSet(ConditionalGetMixin, CachedResponseMixin,
+                   KeysetPaginationMixin, SerializationTimingMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre').order_by('name')
     permission_classes = (AdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter)
     filterset_class = TitleFilter
+    keyset_excluded_params = (TitleSearchFilter.search_param,)
+    ranking_actions = {
+        'top_rated': TitleRanking.TOP_RATED,
+        'trending': TitleRanking.TRENDING,
+    }
+    cache_dependencies = ('title', 'genre', 'category', 'review')
+    export_chunk_size = 500
+
+    @property
+    def keyset_ordering(self):
+        if self.action in self.ranking_actions:
+            return ('position',)
+        return ('name', 'id')
+
+    def get_cache_dependencies(self):
+        if self.action in self.ranking_actions:
+            return self.cache_dependencies + (
+                TitleRanking._meta.model_name,)
+        return self.cache_dependencies
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'export'):
             return ListRetrieveTitleSerializer
         return CreateUpdateDestroyTitleSerializer
 
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[IsAdminOrPartner],
+        url_path='export',
+    )
+    def export(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).order_by('pk')
+        return StreamingHttpResponse(
+            self.stream_titles(queryset),
+            content_type='application/x-ndjson'
+        )
+
+    def stream_titles(self, queryset):
+        last_pk = 0
+        while True:
+            chunk = list(
+                queryset.filter(pk__gt=last_pk)[:self.export_chunk_size])
+            if not chunk:
+                return
+            for title in self.get_serializer(chunk, many=True).data:
+                yield json.dumps(title, ensure_ascii=False) + '\n'
+            last_pk = chunk[-1].pk
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        items, errors = validate_items(BulkTitleSerializer, request.data)
+        titles = bulk_create_titles(items, errors)
+        serializer = timed_serializer(ListRetrieveTitleSerializer(
+            self.get_queryset().filter(pk__in=[title.pk for title in titles]),
+            many=True
+        ))
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request):
+        return self.conditional_response(
+            partial(self.cached_response, self.facets_response), request)
+
+    @action(detail=False, methods=['get'], url_path='top-rated')
+    def top_rated(self, request):
+        return self.conditional_response(
+            partial(self.cached_response, self.ranking_response), request)
+
+    @action(detail=False, methods=['get'], url_path='trending')
+    def trending(self, request):
+        return self.conditional_response(
+            partial(self.cached_response, self.ranking_response), request)
+
+    def ranking_response(self, request):
+        genre = request.query_params.get('genre')
+        category = request.query_params.get('category')
+        if genre and category:
+            raise ValidationError('Укажите либо жанр, либо категорию.')
+        scope = TitleRanking.OVERALL_SCOPE
+        if genre:
+            scope = TitleRanking.genre_scope(genre)
+        elif category:
+            scope = TitleRanking.category_scope(category)
+        queryset = TitleRanking.objects.filter(
+            kind=self.ranking_actions[self.action], scope=scope
+        ).select_related('title__category').prefetch_related(
+            'title__genre').order_by('position')
+        page = self.paginate_queryset(queryset)
+        serializer = timed_serializer(TitleRankingSerializer(page, many=True))
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path='stats')
+    def stats(self, request, pk=None):
+        return self.conditional_response(
+            partial(self.cached_response, self.stats_response), request)
+
+    def stats_response(self, request):
+        pk = self.kwargs[self.lookup_field]
+        try:
+            stats = generics.get_object_or_404(TitleStats, title_id=pk)
+        except Http404:
+            stats = TitleStats(title=generics.get_object_or_404(Title, pk=pk))
+        return Response(
+            timed_serializer(TitleStatsSerializer(stats)).data,
+            status=status.HTTP_200_OK)
+
+    def facets_response(self, request):
+        try:
+            year_bucket = int(request.query_params.get('year_bucket', 1))
+        except ValueError:
+            year_bucket = 0
+        if year_bucket < 1:
+            raise ValidationError(
+                {'year_bucket': 'Укажите целое положительное число.'})
+        queryset = self.filter_queryset(Title.objects.all())
+        return Response(
+            title_facets(queryset, year_bucket), status=status.HTTP_200_OK)
+
 
 class Token(APIView):
     permission_classes = (AllowAny,)
@@ -126,7 +322,7 @@ class Token(APIView):
         )
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(SerializationTimingMixin, ModelViewSet):
     permission_classes = (IsAdminUser,)
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -141,11 +337,11 @@ class UserViewSet(ModelViewSet):
     def me(self, request):
         user = request.user
         if request.method == 'PATCH':
-            serializer = UserProfileSerializer(
-                user, data=request.data, partial=True)
+            serializer = timed_serializer(UserProfileSerializer(
+                user, data=request.data, partial=True))
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
 
-        serializer = UserProfileSerializer(user)
+        serializer = timed_serializer(UserProfileSerializer(user))
         return Response(serializer.data, status=status.HTTP_200_OK)
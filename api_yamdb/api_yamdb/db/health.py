@@ -0,0 +1,29 @@
+from django.db import connections
+
+
+class HealthCheckDatabaseWrapperMixin:
+    # Проверка выполняется при первом обращении к БД в запросе, как
+    # в Django 4.1, поэтому ответы из кэша и 304 обходятся без SELECT 1.
+
+    def ensure_connection(self):
+        if self.__dict__.pop('health_check_needed', False):
+            self.close_if_unusable()
+        super().ensure_connection()
+
+    def close_if_unusable(self):
+        # Разорванное сервером соединение закрывается и будет открыто
+        # заново, а не вернет ошибку посреди запроса.
+        if (self.connection is not None
+                and self.settings_dict.get('CONN_HEALTH_CHECKS')
+                and not self.in_atomic_block
+                and not self.is_usable()):
+            self.close()
+
+
+def mark_connections(**kwargs):
+    # Соединения из пула проверяет сам пул при выдаче.
+    for connection in connections.all():
+        if (isinstance(connection, HealthCheckDatabaseWrapperMixin)
+                and connection.connection is not None
+                and connection.settings_dict.get('CONN_HEALTH_CHECKS')):
+            connection.health_check_needed = True
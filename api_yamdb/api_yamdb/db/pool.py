@@ -0,0 +1,210 @@
+import os
+import threading
+import time
+from collections import Counter
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_TIMEOUT = 5.0
+DEFAULT_CHECK_IDLE_TIME = 1.0
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class ConnectionPool:
+    # Пул открытых соединений процесса, общий для всех его потоков.
+    # Соединения выдаются в порядке LIFO, чтобы редко используемые
+    # закрывались по времени жизни, а не держались открытыми все сразу.
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT,
+                 max_lifetime=None, check=None,
+                 check_idle_time=DEFAULT_CHECK_IDLE_TIME):
+        self.size = size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check = check
+        # Соединение, вернувшееся в пул только что, не проверяется.
+        self.check_idle_time = check_idle_time
+        self.condition = threading.Condition()
+        self.idle = []
+        self.created_at = {}
+        self.open = 0
+        self.counters = Counter()
+
+    def acquire(self, connect):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            item = self.take(deadline)
+            if item is None:
+                return self.create(connect)
+            connection, released_at = item
+            if self.is_usable(connection, released_at):
+                with self.condition:
+                    self.counters['reused'] += 1
+                return connection
+            self.discard(connection)
+
+    def take(self, deadline):
+        # Свободное соединение или None, если можно открыть новое.
+        with self.condition:
+            waited = False
+            while not self.idle and self.open >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        'Нет свободных соединений в пуле '
+                        f'за {self.timeout} с.')
+                if not waited:
+                    self.counters['waits'] += 1
+                    waited = True
+                self.condition.wait(remaining)
+            if self.idle:
+                return self.idle.pop()
+            self.open += 1
+            return None
+
+    def create(self, connect):
+        try:
+            connection = connect()
+        except Exception:
+            with self.condition:
+                self.open -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.created_at[id(connection)] = time.monotonic()
+            self.counters['created'] += 1
+        return connection
+
+    def is_expired(self, connection):
+        return (self.max_lifetime is not None
+                and time.monotonic() - self.created_at[id(connection)]
+                >= self.max_lifetime)
+
+    def is_usable(self, connection, released_at):
+        if self.is_expired(connection):
+            return False
+        idle_time = time.monotonic() - released_at
+        if (self.check is not None and idle_time >= self.check_idle_time
+                and not self.check(connection)):
+            with self.condition:
+                self.counters['failed_checks'] += 1
+            return False
+        return True
+
+    def release(self, connection, discard=False):
+        if discard or self.is_expired(connection):
+            self.discard(connection)
+            return
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self.condition:
+            self.created_at.pop(id(connection), None)
+            self.open -= 1
+            self.counters['discarded'] += 1
+            self.condition.notify()
+
+    def close(self):
+        with self.condition:
+            idle, self.idle = self.idle, []
+        for connection, _ in idle:
+            self.discard(connection)
+
+    def stats(self):
+        with self.condition:
+            return {
+                'size': self.size,
+                'open': self.open,
+                'idle': len(self.idle),
+                'in_use': self.open - len(self.idle),
+                'created': self.counters['created'],
+                'reused': self.counters['reused'],
+                'discarded': self.counters['discarded'],
+                'failed_checks': self.counters['failed_checks'],
+                'waits': self.counters['waits'],
+                'timeouts': self.counters['timeouts'],
+            }
+
+
+def get_pool(wrapper):
+    # Пул создается заново в дочернем процессе после fork.
+    key = (os.getpid(), wrapper.alias)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = wrapper.settings_dict['POOL']
+                check = None
+                if wrapper.settings_dict.get('CONN_HEALTH_CHECKS'):
+                    check = wrapper.ping_connection
+                pool = ConnectionPool(
+                    size=options.get('SIZE', DEFAULT_POOL_SIZE),
+                    timeout=options.get('TIMEOUT', DEFAULT_POOL_TIMEOUT),
+                    max_lifetime=options.get('MAX_LIFETIME'),
+                    check=check,
+                    check_idle_time=options.get(
+                        'CHECK_IDLE_TIME', DEFAULT_CHECK_IDLE_TIME)
+                )
+                _pools[key] = pool
+    return pool
+
+
+def pool_stats(alias):
+    pool = _pools.get((os.getpid(), alias))
+    return pool.stats() if pool is not None else None
+
+
+class PooledDatabaseWrapperMixin:
+    # Соединение берется из пула при подключении и возвращается в пул
+    # при закрытии, то есть в конце каждого запроса. Без настройки POOL
+    # соединения открываются и закрываются как обычно.
+
+    @property
+    def is_pooled(self):
+        return bool(self.settings_dict.get('POOL'))
+
+    def get_new_connection(self, conn_params):
+        if not self.is_pooled:
+            return super().get_new_connection(conn_params)
+        try:
+            return get_pool(self).acquire(
+                lambda: super(PooledDatabaseWrapperMixin, self)
+                .get_new_connection(conn_params))
+        except PoolTimeoutError as error:
+            raise self.Database.OperationalError(str(error)) from error
+
+    def _close(self):
+        if not self.is_pooled:
+            super()._close()
+            return
+        if self.connection is None:
+            return
+        # Соединение с ошибками или незавершенной транзакцией
+        # в пул не возвращается.
+        discard = (self.errors_occurred or self.in_atomic_block
+                   or not self.autocommit)
+        get_pool(self).release(self.connection, discard=discard)
+
+    def ping_connection(self, connection):
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+            finally:
+                cursor.close()
+        except self.Database.Error:
+            return False
+        return True
@@ -0,0 +1,9 @@
+from django.db.backends.postgresql import base
+
+from ..health import HealthCheckDatabaseWrapperMixin
+from ..pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(HealthCheckDatabaseWrapperMixin,
+                      PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    pass
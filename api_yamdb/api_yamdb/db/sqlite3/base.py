@@ -0,0 +1,9 @@
+from django.db.backends.sqlite3 import base
+
+from ..health import HealthCheckDatabaseWrapperMixin
+from ..pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(HealthCheckDatabaseWrapperMixin,
+                      PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    pass
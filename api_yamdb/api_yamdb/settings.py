@@ -1,5 +1,6 @@
 import datetime
 import os
+import tempfile
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -16,6 +17,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'reviews',
@@ -23,11 +25,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestTimingMiddleware',
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -56,16 +61,40 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 
+DB_ENGINE = os.getenv('DB_ENGINE', default='django.db.backends.postgresql')
+
+CONN_MAX_AGE = int(os.getenv('CONN_MAX_AGE', default=60))
+
+DB_POOL = os.getenv('DB_POOL', default='').lower() in ('1', 'true', 'yes')
+
+# Обертки бэкендов проверяют соединения и, если включен DB_POOL,
+# берут их из пула процесса.
+DB_ENGINES = {
+    'django.db.backends.postgresql': 'api_yamdb.db.postgresql',
+    'django.db.backends.sqlite3': 'api_yamdb.db.sqlite3',
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': os.getenv(
-            'DB_ENGINE',
-            default='django.db.backends.postgresql'),
+        'ENGINE': DB_ENGINES.get(DB_ENGINE, DB_ENGINE),
         'NAME': os.getenv('DB_NAME', default='postgres'),
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='database'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # С пулом соединение возвращается в пул в конце каждого запроса,
+        # а CONN_MAX_AGE ограничивает время жизни соединения в пуле.
+        'CONN_MAX_AGE': 0 if DB_POOL else CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'CONN_HEALTH_CHECKS', default='true').lower() in (
+                '1', 'true', 'yes'),
+        'POOL': {
+            'SIZE': int(os.getenv('DB_POOL_SIZE', default=10)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=5)),
+            'MAX_LIFETIME': CONN_MAX_AGE or None,
+            'CHECK_IDLE_TIME': float(
+                os.getenv('DB_POOL_CHECK_IDLE_TIME', default=1)),
+        } if DB_POOL else None,
     }
 }
 
@@ -80,6 +109,24 @@ DATABASES = {
 #     }
 # }
 
+# Версии данных хранятся в кэше, поэтому он должен быть общим для всех
+# процессов: воркеров gunicorn и management-команд.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            default=os.path.join(tempfile.gettempdir(), 'yamdb-cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', default=3000)),
+        },
+    }
+}
+
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+
 AUTH_USER_MODEL = 'reviews.User'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -101,12 +148,20 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', default=50))
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(
+    os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5))
+
+EMAIL_OUTBOX_RETRY_DELAY = int(
+    os.getenv('EMAIL_OUTBOX_RETRY_DELAY', default=30))
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'api.pagination.Pagination',
 }
@@ -116,6 +171,56 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': datetime.timedelta(days=15),
 }
 
+AUTH_USER_CACHE_TIMEOUT = int(
+    os.getenv('AUTH_USER_CACHE_TIMEOUT', default=60))
+
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', default=1024))
+
+SLOW_REQUEST_THRESHOLD = int(
+    os.getenv('SLOW_REQUEST_THRESHOLD', default=500))
+
+SLOW_REQUEST_TOP_QUERIES = int(
+    os.getenv('SLOW_REQUEST_TOP_QUERIES', default=5))
+
+METRICS_DIR = os.getenv(
+    'METRICS_DIR', default=os.path.join(tempfile.gettempdir(), 'yamdb-metrics'))
+
+PROFILING_DIR = os.getenv(
+    'PROFILING_DIR',
+    default=os.path.join(tempfile.gettempdir(), 'yamdb-profiles'))
+
+PROFILING_MODE = os.getenv('PROFILING_MODE', default='cprofile')
+
+PROFILING_SAMPLING_INTERVAL = float(
+    os.getenv('PROFILING_SAMPLING_INTERVAL', default=0.005))
+
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', default=0))
+
+PROFILING_ROUTE_SAMPLE_RATES = {
+    route.strip(): float(rate)
+    for route, rate in (
+        item.split('=') for item in os.getenv(
+            'PROFILING_ROUTE_SAMPLE_RATES', default='').split(',')
+        if item.strip()
+    )
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.slow_requests': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+    },
+}
+
 ADMIN_EMAIL = 'from@admin.com'
 
 LANGUAGE_CODE = 'ru'
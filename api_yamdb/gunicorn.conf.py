@@ -0,0 +1,11 @@
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+
+def on_starting(server):
+    # Счетчики метрик прошлого запуска не должны суммироваться с новыми.
+    from api.metrics import clear_metrics
+    from django.conf import settings
+
+    clear_metrics(settings.METRICS_DIR)
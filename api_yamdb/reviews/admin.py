@@ -1,6 +1,38 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .models import (Category, Comment, Genre, OutgoingEmail, Review, Title,
+                     User)
+from .search import search_titles
+
+ESTIMATED_COUNT_THRESHOLD = 100000
+
+
+class EstimatedCountPaginator(Paginator):
+    # Для большой таблицы без фильтров количество строк берется из
+    # статистики PostgreSQL вместо COUNT(*) по всей таблице.
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row is not None and row[0] >= ESTIMATED_COUNT_THRESHOLD:
+                return int(row[0])
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -9,11 +41,14 @@ class CategoryAdmin(admin.ModelAdmin):
     list_editable = ('name', 'slug',)
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = ('id', 'text', 'author', 'pub_date', 'review',)
-    search_fields = ('text', 'author', 'pub_date', 'review',)
-    list_filter = ('author', 'pub_date', 'review',)
+    list_select_related = ('author', 'review__author',
+                           'review__title__category',)
+    search_fields = ('author__username__exact',)
+    list_filter = ('pub_date',)
     list_editable = ('text',)
+    raw_id_fields = ('author', 'review',)
 
 
 class GenreAdmin(admin.ModelAdmin):
@@ -22,32 +57,52 @@ class GenreAdmin(admin.ModelAdmin):
     list_editable = ('name', 'slug',)
 
 
-class ReviewAdmin(admin.ModelAdmin):
+class OutgoingEmailAdmin(LargeTableAdmin):
+    list_display = ('id', 'recipient', 'subject', 'status', 'attempts',
+                    'next_attempt_at', 'sent_at',)
+    search_fields = ('recipient',)
+    list_filter = ('status',)
+    empty_value_display = '-пусто-'
+
+
+class ReviewAdmin(LargeTableAdmin):
     list_display = ('id', 'text', 'author', 'score', 'pub_date', 'title',)
-    search_fields = ('text', 'author', 'score', 'pub_date', 'title',)
-    list_filter = ('author', 'score', 'pub_date', 'title',)
+    list_select_related = ('author', 'title__category',)
+    search_fields = ('author__username__exact', 'title__name__exact',)
+    list_filter = ('score', 'pub_date',)
     list_editable = ('text',)
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('title',)
     empty_value_display = '-пусто-'
 
 
-class TitleAdmin(admin.ModelAdmin):
+class TitleAdmin(LargeTableAdmin):
     list_display = ('id', 'name', 'year', 'description', 'category',)
-    search_fields = ('name', 'year', 'description', 'genre', 'category',)
-    list_filter = ('year', 'genre', 'category',)
-    list_editable = ('name', 'year', 'description', 'category',)
+    list_select_related = ('category',)
+    search_fields = ('name',)
+    list_filter = ('genre', 'category',)
+    list_editable = ('name', 'year', 'description',)
+    autocomplete_fields = ('genre', 'category',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по индексам полнотекстового и триграммного поиска.
+        if not search_term.strip():
+            return queryset, False
+        return search_titles(queryset, search_term), False
+
 
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(LargeTableAdmin):
     list_display = ('id', 'username', 'email', 'first_name', 'last_name',
                     'bio')
-    search_fields = ('username',)
+    search_fields = ('username__exact', 'email__exact',)
     empty_value_display = '-пусто-'
 
 
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Genre, GenreAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
 admin.site.register(Review, ReviewAdmin)
 admin.site.register(Title, TitleAdmin)
 admin.site.register(User, UserAdmin)
@@ -0,0 +1,122 @@
+import io
+from collections import deque
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import connection, models
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def init_worker():
+    if not apps.ready:
+        django.setup()
+
+
+def prepare_rows(model_label, header, rows, first_line):
+    model = apps.get_model(model_label)
+    fields = [model._meta.get_field(name) for name in header]
+    prepared = []
+    errors = []
+    for line, row in enumerate(rows, first_line):
+        values = {}
+        for field, value in zip(fields, row):
+            # Пустое значение проверяется как обычное, кроме полей
+            # с blank=True и пароля: в API входят по коду подтверждения.
+            if value == '' and (field.blank or field.name == 'password'):
+                values[field.attname] = None if field.null else value
+                continue
+            try:
+                if field.is_relation:
+                    value = field.to_python(value)
+                else:
+                    value = field.clean(value, None)
+            except ValidationError as error:
+                errors.append((line, field.name, '; '.join(error.messages)))
+            values[field.attname] = value
+        prepared.append(values)
+    return prepared, errors
+
+
+def prepare_in_pool(executor, tasks, window):
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(prepare_rows, *task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def create_objects(model, objects):
+    # Без RETURNING bulk_create не заполняет pk, поэтому объекты сохраняются
+    # по одному и сигналы модели отрабатывают как обычно.
+    if connection.features.can_return_rows_from_bulk_insert:
+        model.objects.bulk_create(objects)
+        return False
+    for obj in objects:
+        obj.save()
+    return True
+
+
+def copy_supported():
+    return connection.vendor == 'postgresql'
+
+
+def insert_objects(model, objects):
+    if not objects:
+        return
+    if copy_supported():
+        copy_objects(model, objects)
+    else:
+        model.objects.bulk_create(objects)
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def copy_objects(model, objects):
+    fields = [
+        field for field in model._meta.concrete_fields
+        if objects[0].pk is not None or not isinstance(field, models.AutoField)
+    ]
+    buffer = io.StringIO()
+    for obj in objects:
+        buffer.write('\t'.join(
+            _copy_value(field.get_db_prep_save(
+                field.pre_save(obj, True), connection))
+            for field in fields
+        ))
+        buffer.write('\n')
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN',
+            buffer
+        )
+
+
+def reset_sequences(*models_to_reset):
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), models_to_reset)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
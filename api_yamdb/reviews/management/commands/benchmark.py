@@ -0,0 +1,310 @@
+import json
+import time
+from collections import defaultdict
+
+import numpy as np
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Min
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ...models import (Category, Comment, Genre, OutgoingEmail, Review, Title,
+                       User)
+
+API_URL = '/api/v1/'
+DEFAULT_REQUESTS = 1000
+DEFAULT_WARMUP = 100
+DEFAULT_THRESHOLD = 0.2
+SAMPLE_SIZE = 500
+PAGES = 3
+PERCENTILES = (50, 95, 99)
+WORKLOAD = (
+    ('titles_list', 20),
+    ('titles_filter', 15),
+    ('title_detail', 20),
+    ('reviews_pages', 15),
+    ('comments_pages', 10),
+    ('review_create', 10),
+    ('auth_flow', 10),
+)
+
+
+def sample_pks(model, rng, size):
+    # Случайные pk из диапазона существующих: строки, на которые чаще
+    # ссылаются, чаще попадают в выборку через свои отзывы и комментарии.
+    bounds = model.objects.aggregate(first=Min('pk'), last=Max('pk'))
+    if bounds['first'] is None:
+        return []
+    return rng.integers(
+        bounds['first'], bounds['last'], size=size, endpoint=True).tolist()
+
+
+def summarize(latencies, queries, errors):
+    latencies = np.array(latencies)
+    summary = {'requests': len(latencies), 'errors': errors}
+    for percentile, value in zip(
+            PERCENTILES, np.percentile(latencies, PERCENTILES)):
+        summary[f'p{percentile}_ms'] = round(value * 1000, 3)
+    summary['mean_ms'] = round(latencies.mean() * 1000, 3)
+    summary['throughput'] = round(len(latencies) / latencies.sum(), 1)
+    summary['queries_mean'] = round(float(np.mean(queries)), 2)
+    summary['queries_max'] = int(np.max(queries))
+    return summary
+
+
+def find_regressions(baseline, report, threshold):
+    regressions = []
+    for name, current in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if previous is None:
+            continue
+        for percentile in PERCENTILES:
+            key = f'p{percentile}_ms'
+            if current[key] > previous[key] * (1 + threshold):
+                regressions.append(
+                    f'{name}: {key} {previous[key]} -> {current[key]}')
+        if current['queries_max'] > previous['queries_max']:
+            regressions.append(
+                f'{name}: queries_max {previous["queries_max"]} -> '
+                f'{current["queries_max"]}')
+        if current['errors'] > previous['errors']:
+            regressions.append(
+                f'{name}: errors {previous["errors"]} -> '
+                f'{current["errors"]}')
+    return regressions
+
+
+class Command(BaseCommand):
+    help = ('Команда для замера времени ответа и количества SQL-запросов '
+            'эндпоинтов API на данных из БД.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=DEFAULT_REQUESTS,
+            help='Количество сценариев нагрузки, которые попадут в отчет.'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=DEFAULT_WARMUP,
+            help='Количество сценариев для прогрева, не попадающих в отчет.'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Начальное значение генератора случайных чисел.'
+        )
+        parser.add_argument(
+            '--output',
+            default='benchmark.json',
+            help='Файл, в который сохраняется отчет в формате JSON.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Отчет предыдущего запуска, с которым сравниваются '
+                 'результаты.'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help='Допустимый относительный рост задержки при сравнении.'
+        )
+
+    def handle(self, *args, **options):
+        if not Title.objects.exists():
+            raise CommandError(
+                'В БД нет произведений: наполните ее командой '
+                'generatedata или importcsv.')
+        baseline = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                baseline = json.load(file)
+        self.rng = np.random.default_rng(options['seed'])
+        self.prefix = f'benchmark{int(time.time())}'
+        self.prepare()
+        try:
+            self.run_workload(options['warmup'])
+            self.latencies = defaultdict(list)
+            self.queries = defaultdict(list)
+            self.errors = defaultdict(int)
+            started = time.perf_counter()
+            self.run_workload(options['requests'])
+            duration = time.perf_counter() - started
+        finally:
+            self.cleanup()
+
+        report = self.build_report(options, duration)
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.print_report(report)
+        print(f'Отчет сохранен в {options["output"]}!')
+        if baseline is not None:
+            regressions = find_regressions(
+                baseline, report, options['threshold'])
+            if regressions:
+                raise CommandError(
+                    'Результаты хуже сохраненных:\n' + '\n'.join(regressions))
+            print('Регрессий относительно сохраненного отчета нет!')
+
+    def prepare(self):
+        self.client = APIClient()
+        self.title_ids = np.array(
+            Title.objects.values_list('pk', flat=True), dtype=np.int64)
+        popular_titles = list(Review.objects.filter(
+            pk__in=sample_pks(Review, self.rng, SAMPLE_SIZE)
+        ).values_list('title_id', flat=True))
+        self.popular_titles = popular_titles or self.title_ids.tolist()
+        self.popular_reviews = list(Comment.objects.filter(
+            pk__in=sample_pks(Comment, self.rng, SAMPLE_SIZE)
+        ).values_list('review__title_id', 'review_id'))
+        self.filters = (
+            [{'genre': slug}
+             for slug in Genre.objects.values_list('slug', flat=True)]
+            + [{'category': slug}
+               for slug in Category.objects.values_list('slug', flat=True)]
+            + [{'year': year} for year in Title.objects.order_by(
+                'year').values_list('year', flat=True).distinct()]
+        )
+        self.author = User.objects.create(
+            username=self.prefix, email=f'{self.prefix}@yamdb.fake')
+        self.author_token = str(
+            RefreshToken.for_user(self.author).access_token)
+        self.reviewed = set()
+        self.signups = 0
+        self.latencies = None
+
+    def cleanup(self):
+        users = User.objects.filter(username__startswith=self.prefix)
+        OutgoingEmail.objects.filter(
+            recipient__in=users.values('email')).delete()
+        users.delete()
+
+    def run_workload(self, count):
+        names = [name for name, _ in WORKLOAD]
+        weights = np.array([weight for _, weight in WORKLOAD], dtype=float)
+        for index in self.rng.choice(
+                len(names), size=count, p=weights / weights.sum()).tolist():
+            getattr(self, names[index])()
+
+    def request(self, name, method, path, data=None, token=None):
+        credentials = {}
+        if token is not None:
+            credentials['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(self.client, method)(
+                path, data, format='json', **credentials)
+            elapsed = time.perf_counter() - started
+        if self.latencies is not None:
+            self.latencies[name].append(elapsed)
+            self.queries[name].append(len(queries))
+            if response.status_code >= 400:
+                self.errors[name] += 1
+        return response
+
+    def choice(self, values):
+        return values[int(self.rng.integers(len(values)))]
+
+    def titles_list(self):
+        self.request('titles_list', 'get', f'{API_URL}titles/')
+
+    def titles_filter(self):
+        if self.filters:
+            self.request('titles_filter', 'get', f'{API_URL}titles/',
+                         self.choice(self.filters))
+
+    def title_detail(self):
+        title_id = self.choice(self.popular_titles)
+        self.request('title_detail', 'get', f'{API_URL}titles/{title_id}/')
+
+    def follow_pages(self, name, url):
+        for _ in range(PAGES):
+            response = self.request(name, 'get', url)
+            url = response.status_code == 200 and response.json()['next']
+            if not url:
+                break
+
+    def reviews_pages(self):
+        title_id = self.choice(self.popular_titles)
+        self.follow_pages(
+            'reviews_list', f'{API_URL}titles/{title_id}/reviews/')
+
+    def comments_pages(self):
+        if self.popular_reviews:
+            title_id, review_id = self.choice(self.popular_reviews)
+            self.follow_pages(
+                'comments_list',
+                f'{API_URL}titles/{title_id}/reviews/{review_id}/comments/')
+
+    def review_create(self):
+        # Каждый отзыв пишется к новому произведению: у автора может быть
+        # только один отзыв на произведение.
+        title_id = self.choice(self.popular_titles)
+        while title_id in self.reviewed:
+            if len(self.reviewed) >= len(self.title_ids):
+                return
+            title_id = int(self.choice(self.title_ids))
+        self.reviewed.add(title_id)
+        self.request(
+            'review_create', 'post', f'{API_URL}titles/{title_id}/reviews/',
+            {'text': 'Отзыв из нагрузочного теста.',
+             'score': int(self.rng.integers(1, 10, endpoint=True))},
+            token=self.author_token)
+
+    def auth_flow(self):
+        self.signups += 1
+        username = f'{self.prefix}_{self.signups}'
+        self.request('auth_signup', 'post', f'{API_URL}auth/signup/',
+                     {'username': username,
+                      'email': f'{username}@yamdb.fake'})
+        user = User.objects.get(username=username)
+        response = self.request(
+            'auth_token', 'post', f'{API_URL}auth/token/',
+            {'username': username,
+             'confirmation_code': default_token_generator.make_token(user)})
+        if response.status_code != 200:
+            return
+        token = response.json().split()[-1]
+        self.request('users_me', 'get', f'{API_URL}users/me/', token=token)
+
+    def build_report(self, options, duration):
+        requests = sum(len(values) for values in self.latencies.values())
+        return {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'seed': options['seed'],
+            'scenarios': options['requests'],
+            'rows': {
+                model._meta.model_name: model.objects.count()
+                for model in (User, Title, Review, Comment)
+            },
+            'requests': requests,
+            'duration': round(duration, 3),
+            'throughput': round(requests / duration, 1),
+            'endpoints': {
+                name: summarize(
+                    self.latencies[name], self.queries[name],
+                    self.errors[name])
+                for name in sorted(self.latencies)
+            },
+        }
+
+    def print_report(self, report):
+        print(f'{"эндпоинт":<16}{"запросов":>9}{"p50, мс":>10}'
+              f'{"p95, мс":>10}{"p99, мс":>10}{"в сек.":>9}'
+              f'{"SQL":>7}{"ошибок":>8}')
+        for name, summary in report['endpoints'].items():
+            print(f'{name:<16}{summary["requests"]:>9}'
+                  f'{summary["p50_ms"]:>10.2f}{summary["p95_ms"]:>10.2f}'
+                  f'{summary["p99_ms"]:>10.2f}{summary["throughput"]:>9.1f}'
+                  f'{summary["queries_mean"]:>7.1f}{summary["errors"]:>8}')
+        print(f'Всего {report["requests"]} запросов за '
+              f'{report["duration"]:.2f} с ({report["throughput"]} в сек.)')
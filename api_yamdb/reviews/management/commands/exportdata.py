@@ -0,0 +1,105 @@
+import csv
+import gzip
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from ...models import Comment, Review, User
+from .importcsv import DATA_FILES, DEFAULT_BATCH_SIZE
+
+DEFAULT_OUTPUT_DIR = 'export'
+FORMATS = ('csv', 'ndjson')
+SINCE_FIELDS = {
+    User: 'date_joined',
+    Review: 'pub_date',
+    Comment: 'pub_date',
+}
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class Command(BaseCommand):
+    help = 'Команда для выгрузки данных в .csv или .ndjson файлы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            default=DEFAULT_OUTPUT_DIR,
+            help='Каталог для выгружаемых файлов.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default='csv',
+            help='Формат файлов.'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы gzip.'
+        )
+        parser.add_argument(
+            '--since',
+            help='Выгружать пользователей, отзывы и комментарии, созданные '
+                 'не раньше указанного момента (ISO 8601).'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк, получаемых из БД за один раз.'
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(
+                    f'Некорректная дата --since: {options["since"]}')
+        os.makedirs(options['output_dir'], exist_ok=True)
+        for model, file in DATA_FILES:
+            queryset = model.objects.order_by('pk')
+            if since is not None and model in SINCE_FIELDS:
+                queryset = queryset.filter(
+                    **{f'{SINCE_FIELDS[model]}__gte': since})
+            path = os.path.join(
+                options['output_dir'], f'{file}.{options["format"]}')
+            if options['gzip']:
+                path += '.gz'
+            rows = self.export_queryset(
+                queryset, path, options['format'], options['gzip'],
+                options['chunk_size'])
+            print(f'Выгрузка {rows} строк в файл {path} прошла успешно!')
+
+    def export_queryset(self, queryset, path, file_format, compress,
+                        chunk_size):
+        columns = [
+            field.attname for field in queryset.model._meta.concrete_fields]
+        values = queryset.values_list(*columns).iterator(
+            chunk_size=chunk_size)
+        opener = gzip.open if compress else open
+        rows = 0
+        with opener(path, 'wt', newline='', encoding='utf-8') as output:
+            if file_format == 'csv':
+                writer = csv.writer(output, delimiter=',')
+                writer.writerow(columns)
+                for row in values:
+                    writer.writerow([csv_value(value) for value in row])
+                    rows += 1
+            else:
+                for row in values:
+                    output.write(json.dumps(
+                        dict(zip(columns, row)), ensure_ascii=False,
+                        default=str))
+                    output.write('\n')
+                    rows += 1
+        return rows
@@ -0,0 +1,276 @@
+import argparse
+import datetime
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ...bulk import batched, insert_objects, reset_sequences
+from ...models import Category, Comment, Genre, Review, Title, User
+from ...ratings import rebuild_ratings
+from ...stats import rebuild_stats
+from ...versions import bump_versions
+from .importcsv import DEFAULT_BATCH_SIZE
+
+WORDS = (
+    'война', 'мир', 'время', 'дорога', 'город', 'море', 'небо', 'дом',
+    'ночь', 'день', 'тень', 'свет', 'огонь', 'вода', 'ветер', 'звезда',
+    'история', 'сердце', 'тайна', 'жизнь', 'человек', 'остров', 'зима',
+    'лето', 'память', 'песня', 'сон', 'берег', 'путь', 'последний',
+)
+FIRST_YEAR = 1950
+
+
+def zipf_weights(size, exponent):
+    weights = 1 / np.arange(1, size + 1) ** exponent
+    return weights / weights.sum()
+
+
+def zipf_counts(rng, total, size, exponent):
+    # Количество объектов на каждого родителя: несколько родителей получают
+    # большую часть объектов, у остальных их почти нет.
+    return rng.permutation(
+        rng.multinomial(total, zipf_weights(size, exponent)))
+
+
+def moment(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise argparse.ArgumentTypeError(
+            'Укажите дату и время в формате ISO 8601, например '
+            '2024-01-31T12:00:00.')
+    if timezone.is_naive(parsed):
+        return timezone.make_aware(parsed)
+    return parsed
+
+
+def next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+@contextmanager
+def explicit_dates(model):
+    # Даты публикации задаются генератором, а не текущим временем.
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = ('Команда для наполнения БД сгенерированными данными '
+            'с неравномерным распределением отзывов по произведениям.')
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ('users', 1000, 'Количество пользователей.'),
+            ('categories', 10, 'Количество категорий.'),
+            ('genres', 30, 'Количество жанров.'),
+            ('titles', 10000, 'Количество произведений.'),
+            ('reviews', 100000, 'Количество отзывов.'),
+            ('comments', 100000, 'Количество комментариев.'),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default, help=help_text)
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.1,
+            help='Показатель распределения Ципфа для отзывов по '
+                 'произведениям и комментариев по отзывам.'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='За сколько последних дней распределяются даты отзывов '
+                 'и комментариев.'
+        )
+        parser.add_argument(
+            '--now',
+            type=moment,
+            default=None,
+            help='Момент, от которого отсчитываются даты, в формате '
+                 'ISO 8601; по умолчанию текущее время.'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Начальное значение генератора случайных чисел.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк, вставляемых за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        for name in ('users', 'categories', 'genres', 'titles'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} должно быть больше нуля.')
+        self.rng = np.random.default_rng(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = options['now'] or timezone.now()
+        self.days = options['days']
+
+        users = self.generate(User, self.users(options['users']))
+        categories = self.generate(
+            Category, self.categories(options['categories']))
+        genres = self.generate(Genre, self.genres(options['genres']))
+        titles = self.generate(
+            Title, self.titles(options['titles'], categories))
+        self.generate(
+            Title.genre.through, self.genre_titles(titles, genres))
+        reviews = self.generate(Review, self.reviews(
+            options['reviews'], titles, users, options['zipf']))
+        if len(reviews):
+            self.generate(Comment, self.comments(
+                options['comments'], reviews, users, options['zipf']))
+
+        models = (User, Category, Genre, Title, Title.genre.through,
+                  Review, Comment)
+        reset_sequences(*models)
+        rebuild_ratings()
+        rebuild_stats()
+        print('Рейтинги и статистика произведений пересчитаны!')
+        bump_versions(*(model._meta.model_name for model in models))
+
+    def generate(self, model, objects):
+        started = time.monotonic()
+        pks = []
+        with transaction.atomic(), explicit_dates(model):
+            for batch in batched(objects, self.batch_size):
+                insert_objects(model, batch)
+                pks.extend(obj.pk for obj in batch)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        print(f'Создано {len(pks)} объектов {model._meta.model_name} '
+              f'за {elapsed:.2f} с ({len(pks) / elapsed:.0f} строк/с)!')
+        return np.array(pks, dtype=np.int64)
+
+    def texts(self, count, words):
+        indexes = self.rng.integers(0, len(WORDS), size=(count, words))
+        return [
+            ' '.join(WORDS[index] for index in row)
+            for row in indexes.tolist()
+        ]
+
+    def dates(self, size):
+        seconds = self.rng.integers(0, self.days * 24 * 3600, size=size)
+        return [
+            self.now - datetime.timedelta(seconds=int(offset))
+            for offset in seconds
+        ]
+
+    def users(self, count):
+        first = next_pk(User)
+        # Входить по паролю сгенерированным пользователям не нужно.
+        password = make_password(None)
+        for pk in range(first, first + count):
+            yield User(
+                pk=pk,
+                username=f'generated{pk}',
+                email=f'generated{pk}@yamdb.fake',
+                password=password,
+                role=User.USER,
+                date_joined=self.now
+            )
+
+    def categories(self, count):
+        first = next_pk(Category)
+        for pk in range(first, first + count):
+            yield Category(
+                pk=pk, name=f'Категория {pk}', slug=f'generated-{pk}')
+
+    def genres(self, count):
+        first = next_pk(Genre)
+        for pk in range(first, first + count):
+            yield Genre(pk=pk, name=f'Жанр {pk}', slug=f'generated-{pk}')
+
+    def titles(self, count, categories):
+        first = next_pk(Title)
+        years = self.rng.integers(FIRST_YEAR, self.now.year, size=count,
+                                  endpoint=True)
+        title_categories = self.rng.choice(categories, size=count)
+        name_lengths = self.rng.integers(1, 3, size=count, endpoint=True)
+        names = self.texts(count, 3)
+        descriptions = self.texts(count, 12)
+        for index, pk in enumerate(range(first, first + count)):
+            words = names[index].split()[:name_lengths[index]]
+            yield Title(
+                pk=pk,
+                name=' '.join(words).capitalize(),
+                year=int(years[index]),
+                description=descriptions[index],
+                category_id=int(title_categories[index])
+            )
+
+    def genre_titles(self, titles, genres):
+        through = Title.genre.through
+        first = next_pk(through)
+        counts = self.rng.integers(1, min(3, len(genres)), size=len(titles),
+                                   endpoint=True)
+        pk = first
+        for title_id, count in zip(titles.tolist(), counts.tolist()):
+            for genre_id in self.rng.choice(genres, size=count,
+                                            replace=False).tolist():
+                yield through(pk=pk, title_id=title_id, genre_id=genre_id)
+                pk += 1
+
+    def reviews(self, total, titles, users, exponent):
+        # У пользователя не больше одного отзыва на произведение, поэтому
+        # на произведение приходится не больше отзывов, чем пользователей.
+        counts = np.minimum(
+            zipf_counts(self.rng, total, len(titles), exponent), len(users))
+        total = int(counts.sum())
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        offsets = np.repeat(
+            self.rng.integers(0, len(users), size=len(titles)), counts)
+        authors = users[(offsets + np.arange(total) - starts) % len(users)]
+        review_titles = np.repeat(titles, counts)
+        quality = np.repeat(
+            self.rng.normal(7, 1.5, size=len(titles)), counts)
+        scores = np.clip(
+            np.rint(self.rng.normal(quality, 1.5)), 1, 10).astype(int)
+        dates = self.dates(total)
+        texts = self.texts(total, 8)
+        first = next_pk(Review)
+        for index in range(total):
+            yield Review(
+                pk=first + index,
+                title_id=int(review_titles[index]),
+                author_id=int(authors[index]),
+                score=int(scores[index]),
+                text=texts[index],
+                pub_date=dates[index]
+            )
+
+    def comments(self, total, reviews, users, exponent):
+        counts = zipf_counts(self.rng, total, len(reviews), exponent)
+        comment_reviews = np.repeat(reviews, counts)
+        authors = self.rng.choice(users, size=total)
+        dates = self.dates(total)
+        texts = self.texts(total, 6)
+        first = next_pk(Comment)
+        for index in range(total):
+            yield Comment(
+                pk=first + index,
+                review_id=int(comment_reviews[index]),
+                author_id=int(authors[index]),
+                text=texts[index],
+                pub_date=dates[index]
+            )
@@ -1,44 +1,104 @@
 import csv
+import gzip
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
 
+from ...bulk import (batched, init_worker, insert_objects, prepare_in_pool,
+                     prepare_rows, reset_sequences)
 from ...models import Category, Comment, Genre, Review, Title, User
+from ...ratings import rebuild_ratings
+from ...stats import rebuild_stats
+from ...versions import bump_versions
+
+DEFAULT_DATA_DIR = 'static/data'
+DEFAULT_BATCH_SIZE = 5000
+DATA_FILES = (
+    (User, 'users'),
+    (Category, 'category'),
+    (Genre, 'genre'),
+    (Title, 'titles'),
+    (Review, 'review'),
+    (Comment, 'comments'),
+    (Title.genre.through, 'genre_title'),
+)
 
 
 class Command(BaseCommand):
     help = 'Команда для импорта данных из .csv файлов.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            default=DEFAULT_DATA_DIR,
+            help='Каталог с .csv файлами.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк, вставляемых за один запрос.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Количество процессов для разбора и проверки строк.'
+        )
+
     def handle(self, *args, **options):
-        models_files_names = {
-            User: 'users',
-            Category: 'category',
-            Genre: 'genre',
-            Title: 'titles',
-            Review: 'review',
-            Comment: 'comments',
-        }
-        for model, file in models_files_names.items():
-            with open(
-                    f'static/data/{file}.csv',
-                    newline='',
-                    encoding='utf-8'
-            ) as csv_file:
-                datareader = csv.DictReader(csv_file, delimiter=',')
-                model.objects.bulk_create([model(**row) for row in datareader])
-                print(f'Импорт данных из файла static/data/{file}.csv '
-                      f'прошел успешно!')
-        self.add_genres_to_titles()
-
-    def add_genres_to_titles(self):
-        with open(
-                'static/data/genre_title.csv',
-                newline='',
-                encoding='utf-8'
-        ) as csv_file:
-            datareader = csv.DictReader(csv_file, delimiter=',')
-            for row in datareader:
-                title = Title.objects.get(pk=row['title_id'])
-                genre = Genre.objects.get(pk=row['genre_id'])
-                title.genre.add(genre)
-        print('Импорт данных из файла static/data/genre_title.csv '
-              'прошел успешно!')
+        executor = None
+        if options['workers'] > 1:
+            # Дочерние процессы не должны унаследовать открытые соединения.
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                max_workers=options['workers'], initializer=init_worker)
+        try:
+            for model, file in DATA_FILES:
+                path = os.path.join(options['data_dir'], f'{file}.csv')
+                if not os.path.exists(path) and os.path.exists(f'{path}.gz'):
+                    path = f'{path}.gz'
+                started = time.monotonic()
+                with transaction.atomic():
+                    rows = self.import_file(
+                        model, path, options['batch_size'], executor,
+                        options['workers'] * 2)
+                elapsed = max(time.monotonic() - started, 1e-6)
+                print(f'Импорт {rows} строк из файла {path} прошел успешно '
+                      f'за {elapsed:.2f} с ({rows / elapsed:.0f} строк/с)!')
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        models = [model for model, _ in DATA_FILES]
+        reset_sequences(*models)
+        rebuild_ratings()
+        rebuild_stats()
+        print('Рейтинги и статистика произведений пересчитаны!')
+        bump_versions(*(model._meta.model_name for model in models))
+
+    def import_file(self, model, path, batch_size, executor=None, window=0):
+        rows = 0
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', newline='', encoding='utf-8') as csv_file:
+            datareader = csv.reader(csv_file, delimiter=',')
+            header = next(datareader, [])
+            tasks = (
+                (model._meta.label, header, batch, index * batch_size + 2)
+                for index, batch in enumerate(
+                    batched(datareader, batch_size))
+            )
+            if executor is None:
+                prepared = (prepare_rows(*task) for task in tasks)
+            else:
+                prepared = prepare_in_pool(executor, tasks, window)
+            for values, errors in prepared:
+                if errors:
+                    line, field, message = errors[0]
+                    raise CommandError(
+                        f'{path}, строка {line}, поле {field}: {message}')
+                insert_objects(model, [model(**row) for row in values])
+                rows += len(values)
+        return rows
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...models import TitleRanking
+from ...rankings import (DEFAULT_HALF_LIFE, DEFAULT_LIMIT, DEFAULT_WINDOW,
+                         rebuild_rankings)
+from ...versions import bump_versions
+
+
+class Command(BaseCommand):
+    help = ('Команда для пересчета списков лучших и популярных сейчас '
+            'произведений.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=DEFAULT_LIMIT,
+            help='Количество мест в каждом списке.'
+        )
+        parser.add_argument(
+            '--half-life',
+            type=float,
+            default=DEFAULT_HALF_LIFE,
+            help='Через сколько дней вклад отзыва в популярность '
+                 'уменьшается вдвое.'
+        )
+        parser.add_argument(
+            '--window',
+            type=int,
+            default=DEFAULT_WINDOW,
+            help='За сколько последних дней учитываются отзывы '
+                 'для популярности.'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        rows = rebuild_rankings(
+            limit=options['limit'],
+            half_life=options['half_life'],
+            window=options['window']
+        )
+        bump_versions(TitleRanking._meta.model_name)
+        print(f'Рейтинги пересчитаны: {rows} мест '
+              f'за {time.monotonic() - started:.2f} с!')
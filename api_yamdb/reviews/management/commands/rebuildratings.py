@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Title
+from ...ratings import rebuild_ratings
+from ...versions import bump_versions
+
+
+class Command(BaseCommand):
+    help = 'Команда для пересчета рейтингов произведений по отзывам.'
+
+    def handle(self, *args, **options):
+        updated = rebuild_ratings()
+        bump_versions(Title._meta.model_name)
+        print(f'Рейтинги {updated} произведений пересчитаны!')
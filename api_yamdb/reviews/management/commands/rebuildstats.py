@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Review
+from ...stats import rebuild_stats
+from ...versions import bump_versions
+
+
+class Command(BaseCommand):
+    help = 'Команда для пересчета статистики оценок произведений по отзывам.'
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_stats()
+        bump_versions(Review._meta.model_name)
+        print(f'Статистика {rebuilt} произведений пересчитана!')
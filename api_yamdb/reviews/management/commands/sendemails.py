@@ -0,0 +1,84 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ...outbox import claim_batch, deliver
+
+DEFAULT_WORKERS = 4
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+class Command(BaseCommand):
+    help = 'Команда для отправки писем из очереди исходящих писем.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help='Количество потоков, отправляющих письма.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Количество писем, отправляемых через одно соединение.'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=DEFAULT_POLL_INTERVAL,
+            help='Пауза в секундах, если очередь пуста.'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Разобрать очередь и завершить работу.'
+        )
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        worker_options = (
+            stop, options['batch_size'], options['poll_interval'],
+            options['once'])
+        if options['workers'] <= 1:
+            sent, failed = self.work(*worker_options)
+        else:
+            executor = ThreadPoolExecutor(max_workers=options['workers'])
+            futures = [
+                executor.submit(self.work_in_thread, *worker_options)
+                for _ in range(options['workers'])
+            ]
+            try:
+                results = [future.result() for future in futures]
+            except KeyboardInterrupt:
+                stop.set()
+                results = [future.result() for future in futures]
+            finally:
+                executor.shutdown()
+            sent = sum(result[0] for result in results)
+            failed = sum(result[1] for result in results)
+        print(f'Отправлено писем: {sent}, ошибок отправки: {failed}.')
+
+    def work_in_thread(self, *args):
+        try:
+            return self.work(*args)
+        finally:
+            connections.close_all()
+
+    def work(self, stop, batch_size, poll_interval, once):
+        sent = failed = 0
+        while not stop.is_set():
+            emails = claim_batch(batch_size)
+            if not emails:
+                if once:
+                    break
+                stop.wait(poll_interval)
+                continue
+            batch_sent, batch_failed = deliver(emails)
+            sent += batch_sent
+            failed += batch_failed
+        return sent, failed
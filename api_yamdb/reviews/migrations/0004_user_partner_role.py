@@ -0,0 +1,18 @@
+# Generated by Django 3.2.15 on 2026-10-18 05:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('admin', 'admin'), ('user', 'user'), ('moderator', 'moderator'), ('partner', 'partner')], default='user', max_length=9, verbose_name='Роль'),
+        ),
+    ]
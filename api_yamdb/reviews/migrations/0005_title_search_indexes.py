@@ -0,0 +1,50 @@
+# Generated by Django 3.2.15 on 2026-10-18 05:40
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_CONFIG = 'simple'
+
+
+def search_indexes():
+    return (
+        GinIndex(
+            SearchVector('name', config=SEARCH_CONFIG),
+            name='title_name_search_idx'
+        ),
+        GinIndex(
+            fields=['name'],
+            opclasses=['gin_trgm_ops'],
+            name='title_name_trgm_idx'
+        ),
+    )
+
+
+def add_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Title = apps.get_model('reviews', 'Title')
+    for index in search_indexes():
+        schema_editor.add_index(Title, index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Title = apps.get_model('reviews', 'Title')
+    for index in search_indexes():
+        schema_editor.remove_index(Title, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_user_partner_role'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(add_search_indexes, remove_search_indexes),
+    ]
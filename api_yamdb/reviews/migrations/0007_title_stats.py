@@ -0,0 +1,60 @@
+# Generated by Django 3.2.15 on 2026-10-18 05:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def fill_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    rows = Review.objects.order_by().values('title_id').annotate(
+        review_count=Count('pk'),
+        latest_review_at=Max('pub_date'),
+        **{
+            f'score_{score}': Count('pk', filter=Q(score=score))
+            for score in range(1, 11)
+        }
+    )
+    stats = {row['title_id']: row for row in rows}
+    TitleStats.objects.bulk_create(
+        (
+            TitleStats(**stats.get(title_id, {'title_id': title_id}))
+            for title_id in Title.objects.values_list('pk', flat=True)
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('latest_review_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата последнего отзыва')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Количество оценок 1')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Количество оценок 2')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Количество оценок 3')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Количество оценок 4')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Количество оценок 5')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Количество оценок 6')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Количество оценок 7')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Количество оценок 8')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Количество оценок 9')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Количество оценок 10')),
+            ],
+            options={
+                'verbose_name': 'Статистика произведения',
+                'verbose_name_plural': 'Статистика произведений',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
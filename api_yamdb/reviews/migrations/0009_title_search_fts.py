@@ -0,0 +1,51 @@
+# Generated by Django 3.2.15 on 2026-10-18 09:10
+
+from django.db import migrations
+
+FTS_TABLE = 'reviews_title_fts'
+
+# Индекс FTS5 для SQLite хранит только токены названий и обновляется
+# триггерами при любой записи в reviews_title. Если таблица произведений
+# будет пересоздана миграцией, триггеры нужно создать заново.
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    f"name, content='reviews_title', content_rowid='id', "
+    f"tokenize='unicode61')",
+    f"CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+    f"CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) "
+    f"VALUES ('delete', old.id, old.name); END",
+    f"CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF name "
+    f"ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) "
+    f"VALUES ('delete', old.id, old.name); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def run(statements):
+    def execute(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return execute
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_ranking'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE_SQL), run(DROP_SQL)),
+    ]
@@ -1,7 +1,8 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 from .validators import validate_year
 
@@ -53,6 +54,12 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('pub_date',)
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_keyset_idx'
+            ),
+        ]
 
     def __str__(self):
         return (f'Комментарий "{self.text[:settings.NUM_OF_DISP_SYMBOLS]}" '
@@ -85,6 +92,74 @@ class Genre(models.Model):
         return f'Жанр "{self.name}"'
 
 
+class OutgoingEmail(models.Model):
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    subject = models.CharField(
+        verbose_name='Тема',
+        max_length=256
+    )
+    body = models.TextField(
+        verbose_name='Текст'
+    )
+    from_email = models.EmailField(
+        verbose_name='Отправитель',
+        max_length=254
+    )
+    recipient = models.EmailField(
+        verbose_name='Получатель',
+        max_length=254
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING
+    )
+    attempts = models.PositiveIntegerField(
+        verbose_name='Попытки отправки',
+        default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name='Следующая попытка',
+        default=timezone.now
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='Дата отправки',
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('next_attempt_at', 'id',)
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at', 'id'],
+                name='outgoing_email_queue_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'Письмо "{self.subject}" для {self.recipient}'
+
+
 class Review(models.Model):
     text = models.TextField(
         verbose_name='Текст'
@@ -124,6 +199,12 @@ class Review(models.Model):
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         ordering = ('pub_date',)
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_keyset_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
@@ -131,6 +212,10 @@ class Review(models.Model):
             ),
         ]
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return (f'Отзыв "{self.text[:settings.NUM_OF_DISP_SYMBOLS]}" '
                 f'пользователя "{self.author.username}" '
@@ -165,25 +250,167 @@ class Title(models.Model):
         related_name='titles',
         null=True
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('name',)
+        indexes = [
+            models.Index(fields=['name', 'id'], name='title_keyset_idx'),
+        ]
+
+    @property
+    def rating(self):
+        if self.rating_count:
+            return self.rating_sum // self.rating_count
+        return None
 
     def __str__(self):
         return (f'Произведение "{self.name}" '
                 f'из категории "{self.category.name}"')
 
 
+class TitleRanking(models.Model):
+    TOP_RATED = 'top_rated'
+    TRENDING = 'trending'
+    KINDS = (
+        (TOP_RATED, 'Лучшие'),
+        (TRENDING, 'Популярные сейчас'),
+    )
+    OVERALL_SCOPE = ''
+
+    kind = models.CharField(
+        verbose_name='Рейтинг',
+        max_length=16,
+        choices=KINDS
+    )
+    scope = models.CharField(
+        verbose_name='Жанр или категория',
+        max_length=64,
+        blank=True
+    )
+    position = models.PositiveIntegerField(
+        verbose_name='Место'
+    )
+    title = models.ForeignKey(
+        Title,
+        verbose_name='Произведение',
+        on_delete=models.CASCADE,
+        related_name='rankings'
+    )
+    score = models.FloatField(
+        verbose_name='Оценка'
+    )
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Места в рейтингах'
+        ordering = ('kind', 'scope', 'position',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'scope', 'position'],
+                name='unique_ranking_position'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.position} место в рейтинге {self.kind} {self.scope}'
+
+    @staticmethod
+    def genre_scope(slug):
+        return f'genre:{slug}'
+
+    @staticmethod
+    def category_scope(slug):
+        return f'category:{slug}'
+
+
+class TitleStats(models.Model):
+    title = models.OneToOneField(
+        Title,
+        verbose_name='Произведение',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0
+    )
+    latest_review_at = models.DateTimeField(
+        verbose_name='Дата последнего отзыва',
+        null=True,
+        blank=True
+    )
+    score_1 = models.PositiveIntegerField(
+        verbose_name='Количество оценок 1',
+        default=0
+    )
+    score_2 = models.PositiveIntegerField(
+        verbose_name='Количество оценок 2',
+        default=0
+    )
+    score_3 = models.PositiveIntegerField(
+        verbose_name='Количество оценок 3',
+        default=0
+    )
+    score_4 = models.PositiveIntegerField(
+        verbose_name='Количество оценок 4',
+        default=0
+    )
+    score_5 = models.PositiveIntegerField(
+        verbose_name='Количество оценок 5',
+        default=0
+    )
+    score_6 = models.PositiveIntegerField(
+        verbose_name='Количество оценок 6',
+        default=0
+    )
+    score_7 = models.PositiveIntegerField(
+        verbose_name='Количество оценок 7',
+        default=0
+    )
+    score_8 = models.PositiveIntegerField(
+        verbose_name='Количество оценок 8',
+        default=0
+    )
+    score_9 = models.PositiveIntegerField(
+        verbose_name='Количество оценок 9',
+        default=0
+    )
+    score_10 = models.PositiveIntegerField(
+        verbose_name='Количество оценок 10',
+        default=0
+    )
+
+    class Meta:
+        verbose_name = 'Статистика произведения'
+        verbose_name_plural = 'Статистика произведений'
+
+    def __str__(self):
+        return f'Статистика произведения с id {self.title_id}'
+
+
 class User(AbstractUser):
     ADMIN = 'admin'
     USER = 'user'
     MODERATOR = 'moderator'
+    PARTNER = 'partner'
     ROLE_CHOICES = (
         (ADMIN, 'admin'),
         (USER, 'user'),
         (MODERATOR, 'moderator'),
+        (PARTNER, 'partner'),
     )
     email = models.EmailField(
         verbose_name='Эл. Почта',
@@ -214,5 +441,9 @@ class User(AbstractUser):
     def is_moderator(self):
         return self.role == self.MODERATOR
 
+    @property
+    def is_partner(self):
+        return self.role == self.PARTNER
+
     def __str__(self):
         return self.username
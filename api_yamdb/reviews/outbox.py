@@ -0,0 +1,87 @@
+import datetime
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+# Пока письмо обрабатывается воркером, другие воркеры его не берут. Если
+# воркер упал, письмо снова станет доступно по истечении этого времени.
+CLAIM_TIMEOUT = datetime.timedelta(minutes=5)
+MAX_RETRY_DELAY = 3600
+
+
+def enqueue_email(subject, body, recipient, from_email=None):
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.ADMIN_EMAIL,
+        recipient=recipient
+    )
+
+
+def retry_delay(attempts):
+    delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return datetime.timedelta(seconds=min(delay, MAX_RETRY_DELAY))
+
+
+def claim_batch(batch_size=None):
+    now = timezone.now()
+    claimed_until = now + CLAIM_TIMEOUT
+    queryset = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.PENDING, next_attempt_at__lte=now)
+    with transaction.atomic():
+        pending = queryset.order_by('next_attempt_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        ids = list(pending.values_list(
+            'pk', flat=True)[:batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE])
+        # Повторная проверка условия в UPDATE не дает двум воркерам взять
+        # одно письмо на БД без SKIP LOCKED.
+        queryset.filter(pk__in=ids).update(next_attempt_at=claimed_until)
+    return list(OutgoingEmail.objects.filter(
+        pk__in=ids, next_attempt_at=claimed_until))
+
+
+def deliver(emails):
+    sent = []
+    failed = []
+    try:
+        mail_connection = get_connection(fail_silently=False)
+        mail_connection.open()
+    except Exception as error:
+        failed = [(email, error) for email in emails]
+    else:
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email,
+                    [email.recipient], connection=mail_connection)
+                try:
+                    message.send()
+                except Exception as error:
+                    failed.append((email, error))
+                else:
+                    sent.append(email.pk)
+        finally:
+            mail_connection.close()
+
+    now = timezone.now()
+    OutgoingEmail.objects.filter(pk__in=sent).update(
+        status=OutgoingEmail.SENT,
+        attempts=F('attempts') + 1,
+        sent_at=now,
+        last_error=''
+    )
+    for email, error in failed:
+        attempts = email.attempts + 1
+        changes = {'attempts': attempts, 'last_error': repr(error)}
+        if attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            changes['status'] = OutgoingEmail.FAILED
+        else:
+            changes['next_attempt_at'] = now + retry_delay(attempts)
+        OutgoingEmail.objects.filter(pk=email.pk).update(**changes)
+    return len(sent), len(failed)
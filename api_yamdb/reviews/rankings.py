@@ -0,0 +1,153 @@
+import datetime
+from array import array
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .bulk import batched, insert_objects
+from .models import Category, Genre, Review, Title, TitleRanking
+
+DEFAULT_LIMIT = 1000
+DEFAULT_HALF_LIFE = 7
+DEFAULT_WINDOW = 30
+
+
+def load_columns(rows, *typecodes):
+    columns = [array(typecode) for typecode in typecodes]
+    for row in rows.iterator():
+        for column, value in zip(columns, row):
+            column.append(value)
+    return [np.array(column) for column in columns]
+
+
+def lookup(sorted_keys, keys):
+    # Позиции ключей в отсортированном массиве и маска найденных.
+    if not len(sorted_keys):
+        return np.zeros(len(keys), dtype=np.int64), np.zeros(
+            len(keys), dtype=bool)
+    index = np.searchsorted(sorted_keys, keys)
+    index[index == len(sorted_keys)] = 0
+    return index, sorted_keys[index] == keys
+
+
+def bayesian_scores(rating_sums, rating_counts, prior_weight=None):
+    # Средняя оценка, сглаженная к средней по всем отзывам: у произведений
+    # с малым числом отзывов она ближе к общей средней.
+    rated = rating_counts > 0
+    if not rated.any():
+        return np.zeros(len(rating_counts))
+    mean = rating_sums.sum() / rating_counts.sum()
+    if prior_weight is None:
+        prior_weight = rating_counts[rated].mean()
+    return (prior_weight * mean + rating_sums) / (prior_weight + rating_counts)
+
+
+def trending_scores(title_index, ages, half_life, size):
+    # Число недавних отзывов, где вклад отзыва убывает вдвое
+    # за каждые half_life секунд.
+    weights = np.exp2(-ages / half_life)
+    return np.bincount(title_index, weights=weights, minlength=size)
+
+
+def top_per_group(groups, title_ids, scores, limit):
+    # Сортировка по группе, затем по убыванию оценки и по id, чтобы места
+    # во всех группах вычислялись без цикла по группам.
+    order = np.lexsort((title_ids, -scores, groups))
+    groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    sizes = np.diff(np.r_[starts, len(groups)])
+    positions = np.arange(len(groups)) - np.repeat(starts, sizes)
+    keep = positions < limit
+    return order[keep], positions[keep] + 1
+
+
+def title_groups(pks, category_ids):
+    # Каждое произведение входит в общий список, список своей категории
+    # и списки своих жанров; группа 0 - общий список.
+    categories = list(
+        Category.objects.order_by('pk').values_list('pk', 'slug'))
+    genres = list(Genre.objects.order_by('pk').values_list('pk', 'slug'))
+    category_pks = np.array([pk for pk, _ in categories], dtype=np.int64)
+    genre_pks = np.array([pk for pk, _ in genres], dtype=np.int64)
+    scopes = [TitleRanking.OVERALL_SCOPE]
+    scopes += [TitleRanking.category_scope(slug) for _, slug in categories]
+    scopes += [TitleRanking.genre_scope(slug) for _, slug in genres]
+
+    genre_title_ids, genre_ids = load_columns(
+        Title.genre.through.objects.order_by().values_list(
+            'title_id', 'genre_id'), 'q', 'q')
+    category_index, has_category = lookup(category_pks, category_ids)
+    genre_titles, known_titles = lookup(pks, genre_title_ids)
+    genre_index, known_genres = lookup(genre_pks, genre_ids)
+    known = known_titles & known_genres
+
+    everything = np.arange(len(pks))
+    groups = np.concatenate((
+        np.zeros(len(pks), dtype=np.int64),
+        1 + category_index[has_category],
+        1 + len(category_pks) + genre_index[known],
+    ))
+    titles = np.concatenate((
+        everything, everything[has_category], genre_titles[known]))
+    return scopes, groups, titles
+
+
+def compute_rankings(limit=DEFAULT_LIMIT, half_life=DEFAULT_HALF_LIFE,
+                     window=DEFAULT_WINDOW, now=None):
+    now = now or timezone.now()
+    pks, sums, counts, category_ids = load_columns(
+        Title.objects.order_by('pk').values_list(
+            'pk', 'rating_sum', 'rating_count',
+            Coalesce('category_id', Value(0))),
+        'q', 'd', 'd', 'q')
+
+    review_title_ids = array('q')
+    ages = array('d')
+    recent = Review.objects.filter(
+        pub_date__gte=now - datetime.timedelta(days=window)
+    ).order_by().values_list('title_id', 'pub_date')
+    for title_id, pub_date in recent.iterator():
+        review_title_ids.append(title_id)
+        ages.append((now - pub_date).total_seconds())
+    review_titles, known = lookup(pks, np.array(review_title_ids))
+
+    scores = {
+        TitleRanking.TOP_RATED: bayesian_scores(sums, counts),
+        TitleRanking.TRENDING: trending_scores(
+            review_titles[known], np.array(ages)[known],
+            half_life * 24 * 3600, len(pks)),
+    }
+    ranked = {
+        TitleRanking.TOP_RATED: counts > 0,
+        TitleRanking.TRENDING: scores[TitleRanking.TRENDING] > 0,
+    }
+    scopes, groups, titles = title_groups(pks, category_ids)
+    for kind, kind_scores in scores.items():
+        mask = ranked[kind][titles]
+        kind_titles = titles[mask]
+        kind_groups = groups[mask]
+        order, positions = top_per_group(
+            kind_groups, pks[kind_titles], kind_scores[kind_titles], limit)
+        for group, title, position in zip(
+                kind_groups[order].tolist(), kind_titles[order].tolist(),
+                positions.tolist()):
+            yield TitleRanking(
+                kind=kind,
+                scope=scopes[group],
+                position=position,
+                title_id=int(pks[title]),
+                score=float(kind_scores[title])
+            )
+
+
+def rebuild_rankings(batch_size=5000, **options):
+    rows = 0
+    with transaction.atomic():
+        TitleRanking.objects.all().delete()
+        for batch in batched(compute_rankings(**options), batch_size):
+            insert_objects(TitleRanking, batch)
+            rows += len(batch)
+    return rows
@@ -0,0 +1,39 @@
+from django.db.models import (Count, F, IntegerField, OuterRef, Subquery, Sum,
+                              Value)
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Review, Title
+
+
+def add_clamped(field, delta):
+    # Счетчики не уходят ниже нуля, даже если разошлись с отзывами,
+    # например после bulk_create в обход сигналов.
+    if delta < 0:
+        return Greatest(F(field) + delta, Value(0))
+    return F(field) + delta
+
+
+def update_rating(title_id, score_delta, count_delta):
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=add_clamped('rating_sum', score_delta),
+        rating_count=add_clamped('rating_count', count_delta)
+    )
+
+
+def rebuild_ratings(queryset=None):
+    if queryset is None:
+        queryset = Title.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')).order_by().values('title')
+    return queryset.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0,
+            output_field=IntegerField()
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')),
+            0,
+            output_field=IntegerField()
+        )
+    )
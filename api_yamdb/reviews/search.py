@@ -0,0 +1,62 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'simple'
+FTS_TABLE = 'reviews_title_fts'
+TRIGRAM_THRESHOLD = 0.3
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def search_titles(queryset, text):
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(queryset, text)
+    return _search_sqlite(queryset, text)
+
+
+def match_expression(text):
+    # Каждое слово ищется целиком или как префикс: точное совпадение
+    # дает больший bm25, поэтому такие названия выше в выдаче.
+    return ' AND '.join(
+        f'("{token}" OR "{token}"*)'
+        for token in dict.fromkeys(tokenize(text))
+    )
+
+
+def _search_sqlite(queryset, text):
+    match = match_expression(text)
+    if not match:
+        return queryset.none()
+    # Индекс FTS5 присоединяется к произведениям, и bm25 считается в том
+    # же запросе; чем меньше значение, тем выше совпадение. Связь по pk
+    # задана через filter, чтобы ORM подставлял псевдоним таблицы
+    # произведений и во вложенных запросах, например в фасетах.
+    return queryset.extra(
+        select={'rank': f'bm25({FTS_TABLE})'},
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE} MATCH %s'],
+        params=[match]
+    ).filter(
+        pk=RawSQL(f'{FTS_TABLE}.rowid', ())
+    ).order_by('rank', 'name', 'id')
+
+
+def _search_postgresql(queryset, text):
+    from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                                SearchVector,
+                                                TrigramSimilarity)
+
+    vector = SearchVector('name', config=SEARCH_CONFIG)
+    query = SearchQuery(text, config=SEARCH_CONFIG)
+    return queryset.annotate(
+        name_vector=vector,
+        rank=SearchRank(vector, query) + TrigramSimilarity('name', text)
+    ).filter(
+        Q(name_vector=query) | Q(name__trigram_similar=text)
+    ).order_by('-rank', 'name', 'id')
@@ -0,0 +1,187 @@
+import threading
+from collections import defaultdict
+
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save, pre_delete)
+from django.dispatch import receiver
+
+from .bulk import batched
+from .models import Category, Comment, Genre, Review, Title, TitleStats, User
+from .ratings import rebuild_ratings, update_rating
+from .stats import rebuild_stats, update_stats
+from .versions import (bump_versions_on_commit, comments_scope, reviews_scope,
+                       user_scope)
+
+# Запись одного комментария сбрасывает только версию его отзыва; версию
+# модели comment меняют массовые загрузки: importcsv и generatedata.
+VERSIONED_MODELS = (Category, Genre, Review, Title)
+EXISTING_CHECK_BATCH = 500
+
+# Отзывы и произведения, для которых в текущем потоке уже отправлен
+# pre_delete, но рейтинги еще не пересчитаны.
+pending_deletes = threading.local()
+
+
+def _pending():
+    if not hasattr(pending_deletes, 'reviews'):
+        pending_deletes.reviews = {}
+        pending_deletes.titles = set()
+    return pending_deletes
+
+
+def _loaded_rating(review):
+    # Значения читаются из __dict__, чтобы не догружать отложенные поля.
+    title_id = review.__dict__.get('title_id')
+    score = review.__dict__.get('score')
+    if review.pk is None or title_id is None or score is None:
+        return None
+    return title_id, score
+
+
+@receiver(post_init, sender=Review)
+def remember_review_rating(sender, instance, **kwargs):
+    instance._loaded_rating = _loaded_rating(instance)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_reviews_scope_version(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    title_ids = {instance.__dict__.get('title_id')}
+    if instance._loaded_rating is not None:
+        title_ids.add(instance._loaded_rating[0])
+    title_ids.discard(None)
+    bump_versions_on_commit(*(reviews_scope(pk) for pk in title_ids))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comments_scope_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_versions_on_commit(comments_scope(instance.review_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_user_scope_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_versions_on_commit(user_scope(instance.pk))
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    instance._loaded_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+def bump_authored_scope_versions(sender, instance, created, raw=False,
+                                 **kwargs):
+    # Username автора выводится в отзывах и комментариях, поэтому при его
+    # смене сбрасываются версии только списков с записями пользователя.
+    loaded = instance._loaded_username
+    instance._loaded_username = instance.username
+    if created or raw or loaded is None or loaded == instance.username:
+        return
+    title_ids = instance.reviews.values_list(
+        'title_id', flat=True).distinct()
+    review_ids = instance.comments.values_list(
+        'review_id', flat=True).distinct()
+    bump_versions_on_commit(
+        *(reviews_scope(pk) for pk in title_ids),
+        *(comments_scope(pk) for pk in review_ids)
+    )
+
+
+@receiver(post_save, sender=Title)
+def create_title_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        TitleStats.objects.create(title=instance)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = None if created else instance._loaded_rating
+    if not created and old is None:
+        titles = Title.objects.filter(pk=instance.title_id)
+        rebuild_ratings(titles)
+        rebuild_stats(titles)
+    elif old is None:
+        update_rating(instance.title_id, instance.score, 1)
+        update_stats(
+            instance.title_id, added=[instance.score],
+            latest=instance.pub_date)
+    elif old[0] != instance.title_id:
+        update_rating(old[0], -old[1], -1)
+        update_rating(instance.title_id, instance.score, 1)
+        update_stats(old[0], removed=[old[1]])
+        update_stats(
+            instance.title_id, added=[instance.score],
+            latest=instance.pub_date)
+    elif old[1] != instance.score:
+        update_rating(instance.title_id, instance.score - old[1], 0)
+        update_stats(
+            instance.title_id, added=[instance.score], removed=[old[1]])
+    instance._loaded_rating = _loaded_rating(instance)
+
+
+@receiver(pre_delete, sender=Review)
+def load_rating_before_delete(sender, instance, **kwargs):
+    if instance._loaded_rating is None:
+        instance._loaded_rating = Review.objects.filter(
+            pk=instance.pk).values_list('title_id', 'score').first()
+    if instance._loaded_rating is not None:
+        _pending().reviews[instance.pk] = instance._loaded_rating
+
+
+@receiver(pre_delete, sender=Title)
+def remember_deleted_title(sender, instance, **kwargs):
+    _pending().titles.add(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def forget_deleted_title(sender, instance, **kwargs):
+    _pending().titles.discard(instance.pk)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    # Django отправляет pre_delete для всех удаляемых объектов до первого
+    # DELETE, поэтому к первому post_delete известны все отзывы операции:
+    # рейтинг каждого произведения обновляется один раз, а произведения,
+    # удаляемые вместе с отзывами, пропускаются.
+    pending = _pending()
+    if not pending.reviews:
+        return
+    reviews, pending.reviews = pending.reviews, {}
+    deleted_titles, pending.titles = pending.titles, set()
+    # Отзывы из прерванного удаления остались в БД и не учитываются.
+    for pks in batched(list(reviews), EXISTING_CHECK_BATCH):
+        for pk in Review.objects.filter(pk__in=pks).values_list(
+                'pk', flat=True):
+            del reviews[pk]
+    removed = defaultdict(list)
+    for title_id, score in reviews.values():
+        if title_id not in deleted_titles:
+            removed[title_id].append(score)
+    for title_id, scores in removed.items():
+        update_rating(title_id, -sum(scores), -len(scores))
+        update_stats(title_id, removed=scores)
+
+
+def bump_model_version(sender, raw=False, **kwargs):
+    if not raw:
+        bump_versions_on_commit(sender._meta.model_name)
+
+
+def bump_title_genre_version(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_versions_on_commit(Title._meta.model_name)
+
+
+for versioned_model in VERSIONED_MODELS:
+    post_save.connect(bump_model_version, sender=versioned_model)
+    post_delete.connect(bump_model_version, sender=versioned_model)
+m2m_changed.connect(bump_title_genre_version, sender=Title.genre.through)
@@ -0,0 +1,77 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Review, Title, TitleStats
+from .ratings import add_clamped
+
+SCORES = range(1, 11)
+
+
+def score_field(score):
+    return f'score_{score}'
+
+
+def latest_review_date():
+    return Subquery(
+        Review.objects.filter(title=OuterRef('title_id'))
+        .order_by('-pub_date').values('pub_date')[:1]
+    )
+
+
+def update_stats(title_id, added=(), removed=(), latest=None):
+    scores = Counter(added)
+    scores.subtract(removed)
+    changes = {
+        score_field(score): add_clamped(score_field(score), delta)
+        for score, delta in scores.items() if delta
+    }
+    count_delta = len(added) - len(removed)
+    if count_delta:
+        changes['review_count'] = add_clamped('review_count', count_delta)
+    if removed:
+        changes['latest_review_at'] = latest_review_date()
+    elif latest is not None:
+        changes['latest_review_at'] = Greatest(
+            Coalesce('latest_review_at', Value(latest)), Value(latest))
+    if not changes:
+        return
+    updated = TitleStats.objects.filter(title_id=title_id).update(**changes)
+    # Строки может не быть у произведений, созданных в обход сигналов;
+    # тогда она собирается по отзывам, которые уже записаны в БД.
+    if not updated and added:
+        rebuild_stats(Title.objects.filter(pk=title_id))
+
+
+def rebuild_stats(queryset=None, batch_size=1000):
+    if queryset is None:
+        queryset = Title.objects.all()
+    aggregates = {
+        score_field(score): Count('pk', filter=Q(score=score))
+        for score in SCORES
+    }
+    rebuilt = 0
+    last_pk = 0
+    with transaction.atomic():
+        TitleStats.objects.filter(title__in=queryset.values('pk')).delete()
+        while True:
+            title_ids = list(queryset.filter(pk__gt=last_pk).order_by(
+                'pk').values_list('pk', flat=True)[:batch_size])
+            if not title_ids:
+                return rebuilt
+            rows = Review.objects.filter(
+                title_id__gte=title_ids[0], title_id__lte=title_ids[-1]
+            ).order_by().values('title_id').annotate(
+                review_count=Count('pk'),
+                latest_review_at=Max('pub_date'),
+                **aggregates
+            )
+            stats = {row['title_id']: row for row in rows}
+            TitleStats.objects.bulk_create(
+                TitleStats(**stats.get(title_id, {'title_id': title_id}))
+                for title_id in title_ids
+            )
+            rebuilt += len(title_ids)
+            last_pk = title_ids[-1]
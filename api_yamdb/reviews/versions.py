@@ -0,0 +1,53 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'version:{}'
+REVIEWS_SCOPE = 'title-reviews:{}'
+COMMENTS_SCOPE = 'review-comments:{}'
+USER_SCOPE = 'user:{}'
+
+
+def _now():
+    return int(time.time() * 1000)
+
+
+def _keys(names):
+    return [VERSION_KEY.format(name) for name in names]
+
+
+def reviews_scope(title_id):
+    return REVIEWS_SCOPE.format(title_id)
+
+
+def comments_scope(review_id):
+    return COMMENTS_SCOPE.format(review_id)
+
+
+def user_scope(user_id):
+    return USER_SCOPE.format(user_id)
+
+
+def get_versions(*names):
+    # Версия - отметка времени в мс: если ключ вытеснен из кэша, новая
+    # версия все равно окажется больше всех выданных ранее.
+    keys = _keys(names)
+    versions = cache.get_many(keys)
+    missing = {key: _now() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return tuple(versions[key] for key in keys)
+
+
+def bump_versions(*names):
+    keys = _keys(names)
+    versions = cache.get_many(keys)
+    now = _now()
+    cache.set_many(
+        {key: max(now, versions.get(key, 0) + 1) for key in keys}, None)
+
+
+def bump_versions_on_commit(*names):
+    transaction.on_commit(lambda: bump_versions(*names))
@@ -0,0 +1,111 @@
+import pytest
+from django.core.cache import cache
+from django.db import connections
+from django.test.utils import setup_databases, teardown_databases
+from rest_framework.test import APIClient
+
+SQLITE_DATABASES = {
+    'default': {
+        'ENGINE': 'api_yamdb.db.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+
+def _reset_default_connection():
+    try:
+        del connections['default']
+    except AttributeError:
+        pass
+
+
+@pytest.fixture(scope='package')
+def django_db_setup(django_test_environment, django_db_blocker):
+    # Проверки API гоняются на SQLite, не трогая настройки postgresql,
+    # которые проверяет test_settings.
+    original_databases = connections.settings
+    connections.settings = {
+        alias: dict(database) for alias, database in SQLITE_DATABASES.items()
+    }
+    _reset_default_connection()
+    with django_db_blocker.unblock():
+        old_config = setup_databases(verbosity=0, interactive=False)
+    yield
+    with django_db_blocker.unblock():
+        teardown_databases(old_config, verbosity=0)
+    _reset_default_connection()
+    connections.settings = original_databases
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from api.authentication import local_users
+
+    cache.clear()
+    local_users.clear()
+    yield
+    cache.clear()
+    local_users.clear()
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def admin_client(db):
+    from reviews.models import User
+
+    admin = User.objects.create(
+        username='admin', email='admin@yamdb.fake', role=User.ADMIN)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+@pytest.fixture
+def catalogue(db):
+    from reviews.models import Category, Comment, Genre, Review, Title, User
+
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(4)
+    ]
+    users = [
+        User.objects.create(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(5)
+    ]
+    titles = []
+    for i in range(10):
+        title = Title.objects.create(
+            name=f'Произведение {i}',
+            year=2000 + i,
+            category=categories[i % len(categories)]
+        )
+        title.genre.set(genres[:i % len(genres) + 1])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=user, text='Отзыв', score=i + 1)
+        for i, user in enumerate(users)
+    ]
+    for user in users:
+        Comment.objects.create(review=reviews[0], author=user, text='Текст')
+    return {
+        'categories': categories,
+        'genres': genres,
+        'users': users,
+        'titles': titles,
+        'reviews': reviews,
+    }
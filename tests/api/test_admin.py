@@ -0,0 +1,51 @@
+import pytest
+from django.test import Client
+
+
+@pytest.fixture
+def staff_client(db):
+    from reviews.models import User
+
+    user = User.objects.create(
+        username='staff', email='staff@yamdb.fake', is_staff=True,
+        is_superuser=True)
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+@pytest.mark.django_db
+class TestAdmin:
+
+    @pytest.mark.parametrize('model', (
+        'comment', 'review', 'title', 'user', 'category', 'genre',
+        'outgoingemail',
+    ))
+    def test_changelist(self, staff_client, catalogue, model):
+        response = staff_client.get(f'/admin/reviews/{model}/')
+        assert response.status_code == 200
+
+    def test_changelist_queries_do_not_grow(self, staff_client, catalogue,
+                                            django_assert_max_num_queries):
+        from reviews.models import Comment
+
+        review = catalogue['reviews'][1]
+        with django_assert_max_num_queries(8) as context:
+            staff_client.get('/admin/reviews/comment/')
+        baseline = len(context.captured_queries)
+        for user in catalogue['users']:
+            Comment.objects.create(review=review, author=user, text='Текст')
+        with django_assert_max_num_queries(baseline):
+            staff_client.get('/admin/reviews/comment/')
+
+    def test_title_search(self, staff_client, catalogue):
+        response = staff_client.get(
+            '/admin/reviews/title/', {'q': 'Произведение 3'})
+        assert response.status_code == 200
+        assert response.context['cl'].result_count == 1
+
+    def test_user_search_is_exact(self, staff_client, catalogue):
+        response = staff_client.get('/admin/reviews/user/', {'q': 'user'})
+        assert response.context['cl'].result_count == 0
+        response = staff_client.get('/admin/reviews/user/', {'q': 'user1'})
+        assert response.context['cl'].result_count == 1
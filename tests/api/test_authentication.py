@@ -0,0 +1,70 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+def token_client(user):
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    url = '/api/v1/users/me/'
+
+    def test_user_is_loaded_once(self, catalogue,
+                                 django_assert_num_queries):
+        client = token_client(catalogue['users'][0])
+        with django_assert_num_queries(1):
+            assert client.get(self.url).status_code == 200
+        with django_assert_num_queries(0):
+            response = client.get(self.url)
+        assert response.json()['username'] == 'user0'
+
+    def test_role_change_is_visible(self, admin_client, catalogue,
+                                    django_capture_on_commit_callbacks):
+        user = catalogue['users'][0]
+        client = token_client(user)
+        assert client.get('/api/v1/users/').status_code == 403
+        with django_capture_on_commit_callbacks(execute=True):
+            response = admin_client.patch(
+                f'/api/v1/users/{user.username}/', {'role': 'admin'})
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/').status_code == 200
+
+    def test_inactive_user_is_rejected(self, catalogue,
+                                       django_capture_on_commit_callbacks):
+        user = catalogue['users'][0]
+        client = token_client(user)
+        assert client.get(self.url).status_code == 200
+        with django_capture_on_commit_callbacks(execute=True):
+            user.is_active = False
+            user.save()
+        assert client.get(self.url).status_code == 401
+
+    def test_profile_update_is_visible(self, catalogue,
+                                       django_capture_on_commit_callbacks):
+        client = token_client(catalogue['users'][0])
+        client.get(self.url)
+        with django_capture_on_commit_callbacks(execute=True):
+            client.patch(self.url, {'bio': 'Обо мне'})
+        assert client.get(self.url).json()['bio'] == 'Обо мне'
+
+
+class TestSharedCacheCheck:
+
+    def test_default_cache_is_shared(self):
+        from api.checks import check_shared_cache
+
+        assert check_shared_cache(None) == []
+
+    def test_local_memory_cache_warns(self, settings):
+        from api.checks import check_shared_cache
+
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        assert [warning.id for warning in check_shared_cache(None)] == [
+            'api.W001']
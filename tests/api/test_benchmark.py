@@ -0,0 +1,53 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+ENDPOINTS = {
+    'titles_list', 'titles_filter', 'title_detail', 'reviews_list',
+    'comments_list', 'review_create', 'auth_signup', 'auth_token',
+    'users_me',
+}
+
+
+@pytest.mark.django_db
+class TestBenchmark:
+
+    def run(self, path, *options):
+        call_command('benchmark', '--requests=120', '--warmup=10',
+                     f'--output={path}', *options)
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def test_report(self, catalogue, tmp_path):
+        from reviews.models import OutgoingEmail, Review, User
+
+        report = self.run(tmp_path / 'report.json')
+        assert set(report['endpoints']) == ENDPOINTS
+        for name, summary in report['endpoints'].items():
+            assert summary['errors'] == 0, name
+            assert 0 < summary['p50_ms'] <= summary['p95_ms'] <= (
+                summary['p99_ms'])
+            assert summary['throughput'] > 0
+            assert summary['queries_max'] >= summary['queries_mean'] >= 0
+        assert report['endpoints']['review_create']['queries_mean'] > 0
+        assert report['requests'] == sum(
+            summary['requests'] for summary in report['endpoints'].values())
+        assert not User.objects.filter(
+            username__startswith='benchmark').exists()
+        assert not OutgoingEmail.objects.exists()
+        assert Review.objects.count() == len(catalogue['reviews'])
+
+    def test_compare(self, catalogue, tmp_path):
+        baseline = self.run(tmp_path / 'baseline.json')
+        baseline['endpoints']['review_create']['queries_max'] = 0
+        with open(tmp_path / 'baseline.json', 'w', encoding='utf-8') as file:
+            json.dump(baseline, file)
+        with pytest.raises(CommandError, match='review_create: queries_max'):
+            self.run(tmp_path / 'report.json',
+                     f'--compare={tmp_path / "baseline.json"}',
+                     '--threshold=1000')
+
+    def test_empty_database(self, db, tmp_path):
+        with pytest.raises(CommandError):
+            self.run(tmp_path / 'report.json')
@@ -0,0 +1,132 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestBulkTitles:
+    url = '/api/v1/titles/bulk/'
+
+    def test_bulk_create(self, admin_client, catalogue):
+        from reviews.models import Title
+
+        payload = [
+            {'name': f'Новое {i}', 'year': 2020, 'category': 'category-1',
+             'genre': ['genre-0', 'genre-2', 'genre-2']}
+            for i in range(3)
+        ]
+        response = admin_client.post(self.url, payload, format='json')
+        assert response.status_code == 201
+        data = response.json()
+        assert len(data) == 3
+        for title in data:
+            assert title['category']['slug'] == 'category-1'
+            assert sorted(genre['slug'] for genre in title['genre']) == [
+                'genre-0', 'genre-2']
+        assert Title.objects.count() == len(catalogue['titles']) + 3
+
+    def test_bulk_create_reports_item_errors(self, admin_client, catalogue):
+        from reviews.models import Title
+
+        payload = [
+            {'name': 'Верное', 'year': 2020, 'category': 'category-1',
+             'genre': ['genre-0']},
+            {'name': 'Без жанра', 'year': 2020, 'category': 'missing',
+             'genre': ['missing']},
+            {'year': 2020, 'category': 'category-1', 'genre': ['genre-0']},
+        ]
+        response = admin_client.post(self.url, payload, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert set(errors[1]) == {'genre', 'category'}
+        assert set(errors[2]) == {'name'}
+        assert Title.objects.count() == len(catalogue['titles'])
+
+    def test_bulk_create_requires_list(self, admin_client, catalogue):
+        response = admin_client.post(self.url, {}, format='json')
+        assert response.status_code == 400
+
+    def test_bulk_create_forbidden(self, api_client, catalogue):
+        response = api_client.post(self.url, [], format='json')
+        assert response.status_code == 401
+
+    def test_bulk_create_invalidates_cache(
+            self, admin_client, api_client, catalogue,
+            django_capture_on_commit_callbacks):
+        api_client.get('/api/v1/titles/')
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.post(self.url, [
+                {'name': 'Новое', 'year': 2020, 'category': 'category-1',
+                 'genre': ['genre-0']},
+            ], format='json')
+        response = api_client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == len(catalogue['titles']) + 1
+
+
+@pytest.mark.django_db
+class TestBulkReviews:
+
+    def url(self, title):
+        return f'/api/v1/titles/{title.id}/reviews/bulk/'
+
+    def test_bulk_create(self, admin_client, catalogue):
+        title = catalogue['titles'][1]
+        payload = [
+            {'author': user.username, 'text': 'Отзыв', 'score': 10}
+            for user in catalogue['users'][:4]
+        ]
+        response = admin_client.post(self.url(title), payload, format='json')
+        assert response.status_code == 201
+        assert len(response.json()) == 4
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (40, 4)
+        assert title.rating == 10
+
+    def test_authors_are_loaded_once(self, admin_client, catalogue):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        title = catalogue['titles'][1]
+        payload = [
+            {'author': user.username, 'text': 'Отзыв', 'score': 7}
+            for user in catalogue['users']
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(
+                self.url(title), payload, format='json')
+        assert response.status_code == 201
+        assert [review['author'] for review in response.json()] == [
+            user.username for user in catalogue['users']]
+        user_selects = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_user"' in query['sql']
+        ]
+        assert len(user_selects) == 1
+
+    def test_bulk_create_reports_duplicates(self, admin_client, catalogue):
+        title = catalogue['titles'][0]
+        user = catalogue['users'][0]
+        payload = [
+            {'author': user.username, 'text': 'Отзыв', 'score': 10},
+            {'author': 'admin', 'text': 'Отзыв', 'score': 10},
+            {'author': 'admin', 'text': 'Отзыв', 'score': 10},
+            {'author': 'nobody', 'text': 'Отзыв', 'score': 11},
+        ]
+        response = admin_client.post(self.url(title), payload, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert set(errors[0]) == {'author'}
+        assert errors[1] == {}
+        assert set(errors[2]) == {'author'}
+        assert set(errors[3]) == {'score'}
+        assert title.reviews.count() == len(catalogue['reviews'])
+
+    def test_bulk_create_forbidden_for_users(self, catalogue):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(catalogue['users'][0])
+        response = client.post(
+            self.url(catalogue['titles'][1]), [], format='json')
+        assert response.status_code == 403
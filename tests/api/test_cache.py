@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+BUMP_IN_OTHER_PROCESS = '''
+import django
+django.setup()
+from reviews.versions import bump_versions
+bump_versions('genre')
+'''
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_repeated_get_is_served_from_cache(
+            self, api_client, catalogue, django_assert_num_queries):
+        first = api_client.get('/api/v1/titles/')
+        assert first['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            second = api_client.get('/api/v1/titles/')
+        assert second['X-Cache'] == 'HIT'
+        assert second.json() == first.json()
+
+    def test_query_string_is_part_of_key(self, api_client, catalogue):
+        api_client.get('/api/v1/titles/')
+        response = api_client.get('/api/v1/titles/?page=2')
+        assert response['X-Cache'] == 'MISS'
+
+    def test_write_through_api_invalidates(
+            self, api_client, admin_client, catalogue,
+            django_capture_on_commit_callbacks):
+        api_client.get('/api/v1/genres/')
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.post(
+                '/api/v1/genres/', {'name': 'Новый', 'slug': 'new'})
+        response = api_client.get('/api/v1/genres/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == len(catalogue['genres']) + 1
+
+    def test_review_invalidates_title_rating(
+            self, api_client, catalogue,
+            django_capture_on_commit_callbacks):
+        from reviews.models import Review
+
+        title = catalogue['titles'][1]
+        url = f'/api/v1/titles/{title.id}/'
+        assert api_client.get(url).json()['rating'] is None
+        with django_capture_on_commit_callbacks(execute=True):
+            Review.objects.create(
+                title=title, author=catalogue['users'][0], text='Ок', score=8)
+        assert api_client.get(url).json()['rating'] == 8
+
+    def test_rebuild_command_invalidates(self, api_client, catalogue):
+        from reviews.models import Title
+
+        api_client.get('/api/v1/titles/')
+        Title.objects.update(rating_sum=0, rating_count=0)
+        call_command('rebuildratings')
+        assert api_client.get('/api/v1/titles/')['X-Cache'] == 'MISS'
+
+    def test_write_in_other_process_invalidates(self, api_client,
+                                                catalogue):
+        api_client.get('/api/v1/genres/')
+        subprocess.run(
+            [sys.executable, '-c', BUMP_IN_OTHER_PROCESS],
+            cwd=settings.BASE_DIR, check=True,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings'}
+        )
+        assert api_client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+
+    def test_authenticated_requests_bypass_cache(self, admin_client,
+                                                 catalogue):
+        admin_client.get('/api/v1/categories/')
+        response = admin_client.get('/api/v1/categories/')
+        assert 'X-Cache' not in response
+
+    def test_stats(self, api_client, admin_client, catalogue, metrics_dir):
+        api_client.get('/api/v1/categories/')
+        api_client.get('/api/v1/categories/')
+        assert admin_client.get('/api/v1/cache/stats/').json() == {
+            'hits': 1, 'misses': 1}
+        assert api_client.get('/api/v1/cache/stats/').status_code == 401
+        text = api_client.get('/metrics/').content.decode()
+        assert 'api_cache_requests_total{result="hit"} 1.0' in text
+
+    def test_hit_does_not_write_to_cache(self, api_client, catalogue,
+                                         monkeypatch):
+        from django.core.cache import cache
+
+        api_client.get('/api/v1/categories/')
+        writes = []
+        for name in ('set', 'set_many', 'add', 'incr'):
+            monkeypatch.setattr(
+                cache, name, lambda *args, name=name, **kwargs: writes.append(
+                    name))
+        assert api_client.get('/api/v1/categories/')['X-Cache'] == 'HIT'
+        assert not writes
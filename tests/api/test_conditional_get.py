@@ -0,0 +1,110 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_title_detail_not_modified(self, api_client, catalogue,
+                                       django_assert_num_queries):
+        url = f'/api/v1/titles/{catalogue["titles"][0].id}/'
+        etag = api_client.get(url)['ETag']
+        with django_assert_num_queries(0):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_reviews_etag_changes_on_write(
+            self, api_client, catalogue,
+            django_capture_on_commit_callbacks):
+        from reviews.models import Review
+
+        review = catalogue['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etag = api_client.get(url)['ETag']
+        with django_capture_on_commit_callbacks(execute=True):
+            review.text = 'Исправленный отзыв'
+            review.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_other_title_reviews_keep_etag(
+            self, api_client, catalogue,
+            django_capture_on_commit_callbacks):
+        from reviews.models import Review
+
+        title = catalogue['titles'][5]
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = api_client.get(url)['ETag']
+        with django_capture_on_commit_callbacks(execute=True):
+            Review.objects.create(
+                title=catalogue['titles'][6], author=catalogue['users'][0],
+                text='Отзыв', score=5)
+        assert api_client.get(
+            url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_comments_without_last_modified(self, api_client, catalogue):
+        review = catalogue['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        response = api_client.get(url)
+        assert 'Last-Modified' not in response
+        etag = response['ETag']
+        assert api_client.get(
+            url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_bulk_load_resets_comments_etag(self, api_client, catalogue):
+        from reviews.versions import bump_versions
+
+        review = catalogue['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        etag = api_client.get(url)['ETag']
+        bump_versions('comment')
+        assert api_client.get(
+            url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_other_review_comments_keep_etag(
+            self, api_client, catalogue,
+            django_capture_on_commit_callbacks):
+        from reviews.models import Comment
+
+        review = catalogue['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        etag = api_client.get(url)['ETag']
+        with django_capture_on_commit_callbacks(execute=True):
+            Comment.objects.create(
+                review=catalogue['reviews'][1],
+                author=catalogue['users'][0], text='Комментарий')
+        assert api_client.get(
+            url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_new_user_keeps_reviews_etag(
+            self, api_client, catalogue,
+            django_capture_on_commit_callbacks):
+        from reviews.models import User
+
+        review = catalogue['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etag = api_client.get(url)['ETag']
+        with django_capture_on_commit_callbacks(execute=True):
+            User.objects.create(username='newcomer', email='new@ya.ru')
+        assert api_client.get(
+            url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_username_change_resets_authored_etags(
+            self, api_client, catalogue,
+            django_capture_on_commit_callbacks):
+        review = catalogue['reviews'][0]
+        reviews_url = f'/api/v1/titles/{review.title_id}/reviews/'
+        other_url = f'/api/v1/titles/{catalogue["titles"][5].id}/reviews/'
+        reviews_etag = api_client.get(reviews_url)['ETag']
+        other_etag = api_client.get(other_url)['ETag']
+        with django_capture_on_commit_callbacks(execute=True):
+            author = review.author
+            author.username = 'renamed'
+            author.save()
+        response = api_client.get(
+            reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == 200
+        assert 'renamed' in {item['author'] for item in response.json()[
+            'results']}
+        assert api_client.get(
+            other_url, HTTP_IF_NONE_MATCH=other_etag).status_code == 304
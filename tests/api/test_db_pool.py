@@ -0,0 +1,260 @@
+import threading
+
+import pytest
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+
+
+@pytest.fixture
+def unblocked(django_db_blocker):
+    # Проверки работают с отдельными файлами SQLite, а не с тестовой БД.
+    with django_db_blocker.unblock():
+        yield
+
+
+@pytest.fixture
+def pools():
+    from api_yamdb.db.pool import _pools
+
+    _pools.clear()
+    yield
+    for pool in _pools.values():
+        pool.close()
+    _pools.clear()
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def pooled_connections(tmp_path, **options):
+    return ConnectionHandler({
+        'default': {
+            'ENGINE': 'api_yamdb.db.sqlite3',
+            'NAME': str(tmp_path / 'pool.sqlite3'),
+            'CONN_HEALTH_CHECKS': True,
+            'POOL': options,
+        }
+    })
+
+
+class TestConnectionPool:
+
+    def test_reuse(self):
+        from api_yamdb.db.pool import ConnectionPool
+
+        pool = ConnectionPool(size=2)
+        first = pool.acquire(FakeConnection)
+        second = pool.acquire(FakeConnection)
+        pool.release(first)
+        pool.release(second)
+        assert pool.acquire(FakeConnection) is second
+        assert pool.acquire(FakeConnection) is first
+        stats = pool.stats()
+        assert stats['created'] == 2
+        assert stats['reused'] == 2
+        assert stats['in_use'] == 2
+        assert stats['idle'] == 0
+
+    def test_timeout(self):
+        from api_yamdb.db.pool import ConnectionPool, PoolTimeoutError
+
+        pool = ConnectionPool(size=1, timeout=0.05)
+        connection = pool.acquire(FakeConnection)
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire(FakeConnection)
+        stats = pool.stats()
+        assert stats['waits'] == 1
+        assert stats['timeouts'] == 1
+
+        waiter = threading.Timer(0.05, pool.release, (connection,))
+        waiter.start()
+        pool.timeout = 5
+        assert pool.acquire(FakeConnection) is connection
+        waiter.join()
+
+    def test_discard(self):
+        from api_yamdb.db.pool import ConnectionPool
+
+        pool = ConnectionPool(
+            size=1, check=lambda connection: False, check_idle_time=0)
+        broken = pool.acquire(FakeConnection)
+        pool.release(broken, discard=True)
+        assert broken.closed
+        checked = pool.acquire(FakeConnection)
+        pool.release(checked)
+        fresh = pool.acquire(FakeConnection)
+        assert fresh is not checked
+        assert checked.closed
+        stats = pool.stats()
+        assert stats['discarded'] == 2
+        assert stats['failed_checks'] == 1
+        assert stats['open'] == 1
+
+    def test_recently_released_is_not_checked(self):
+        from api_yamdb.db.pool import ConnectionPool
+
+        checked = []
+        pool = ConnectionPool(size=1, check=checked.append,
+                              check_idle_time=60)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        assert pool.acquire(FakeConnection) is connection
+        assert not checked
+
+    def test_max_lifetime(self):
+        from api_yamdb.db.pool import ConnectionPool
+
+        pool = ConnectionPool(size=1, max_lifetime=0)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        assert connection.closed
+        assert pool.stats()['open'] == 0
+
+    def test_failed_connect_frees_slot(self):
+        from api_yamdb.db.pool import ConnectionPool
+
+        def connect():
+            raise OSError
+
+        pool = ConnectionPool(size=1, timeout=0)
+        with pytest.raises(OSError):
+            pool.acquire(connect)
+        assert pool.acquire(FakeConnection)
+
+
+class TestPooledBackend:
+
+    def test_connections_are_returned_to_pool(self, tmp_path, unblocked,
+                                              pools):
+        from api_yamdb.db.pool import pool_stats
+
+        handler = pooled_connections(tmp_path, SIZE=2)
+
+        def query():
+            connection = handler['default']
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.close()
+
+        for _ in range(3):
+            threads = [threading.Thread(target=query) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        stats = pool_stats('default')
+        assert stats['created'] <= 2
+        assert stats['created'] + stats['reused'] == 6
+        assert stats['in_use'] == 0
+
+    def test_pool_timeout_is_operational_error(self, tmp_path, unblocked,
+                                               pools):
+        handler = pooled_connections(tmp_path, SIZE=1, TIMEOUT=0.01)
+        handler['default'].ensure_connection()
+        errors = []
+
+        def connect():
+            try:
+                handler['default'].ensure_connection()
+            except OperationalError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=connect)
+        thread.start()
+        thread.join()
+        handler['default'].close()
+        assert len(errors) == 1
+
+
+class TestHealthChecks:
+
+    @pytest.fixture
+    def connection(self, tmp_path, unblocked, pools):
+        handler = ConnectionHandler({
+            'default': {
+                'ENGINE': 'api_yamdb.db.sqlite3',
+                'NAME': str(tmp_path / 'health.sqlite3'),
+                'CONN_MAX_AGE': 60,
+                'CONN_HEALTH_CHECKS': True,
+            }
+        })
+        yield handler['default']
+        handler['default'].close()
+
+    def test_unusable_connection_is_closed(self, connection, monkeypatch):
+        connection.ensure_connection()
+        connection.close_if_unusable()
+        assert connection.connection is not None
+
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        connection.close_if_unusable()
+        assert connection.connection is None
+
+    def test_checked_on_first_use(self, connection, monkeypatch):
+        connection.ensure_connection()
+        opened = connection.connection
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        connection.health_check_needed = True
+        connection.ensure_connection()
+        assert connection.connection is not opened
+        assert connection.connection is not None
+
+    def test_not_pooled_without_pool_settings(self, connection):
+        from api_yamdb.db.pool import pool_stats
+
+        connection.ensure_connection()
+        connection.close()
+        assert connection.connection is None
+        assert pool_stats('default') is None
+
+
+@pytest.mark.django_db
+class TestLazyHealthChecks:
+
+    @pytest.fixture
+    def checks(self, monkeypatch):
+        from django.db import connection
+
+        checked = []
+        monkeypatch.setitem(connection.settings_dict, 'CONN_HEALTH_CHECKS',
+                            True)
+        monkeypatch.setattr(connection, 'close_if_unusable',
+                            lambda: checked.append(connection))
+        return checked
+
+    def test_cached_response_is_not_checked(self, api_client, catalogue,
+                                            checks):
+        url = f'/api/v1/titles/{catalogue["titles"][0].id}/'
+        assert api_client.get(url)['X-Cache'] == 'MISS'
+        assert len(checks) == 1
+        assert api_client.get(url)['X-Cache'] == 'HIT'
+        etag = api_client.get(url)['ETag']
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        assert len(checks) == 1
+
+    def test_checked_once_per_request(self, api_client, catalogue, checks):
+        review = catalogue['reviews'][0]
+        api_client.get(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/')
+        assert len(checks) == 1
+
+
+@pytest.mark.django_db
+class TestDatabaseStats:
+
+    def test_admin(self, admin_client):
+        response = admin_client.get('/api/v1/db/stats/')
+        assert response.status_code == 200
+        stats = response.json()['default']
+        assert stats['vendor'] == 'sqlite'
+        assert stats['pool'] is None
+
+    def test_anonymous(self, api_client):
+        response = api_client.get('/api/v1/db/stats/')
+        assert response.status_code == 401
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+from rest_framework.test import APIClient
+
+
+def read_lines(response):
+    content = b''.join(response.streaming_content).decode()
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db
+class TestTitlesExport:
+    url = '/api/v1/titles/export/'
+
+    def test_admin_gets_all_titles(self, admin_client, catalogue):
+        response = admin_client.get(self.url)
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        titles = read_lines(response)
+        assert [title['id'] for title in titles] == sorted(
+            title.id for title in catalogue['titles'])
+        assert titles[0]['rating'] is not None
+        assert titles[0]['genre'] and titles[0]['category']
+
+    def test_partner_access(self, catalogue):
+        from reviews.models import User
+
+        partner = User.objects.create(
+            username='partner', email='partner@yamdb.fake',
+            role=User.PARTNER)
+        client = APIClient()
+        client.force_authenticate(partner)
+        assert client.get(self.url).status_code == 200
+        client.force_authenticate(catalogue['users'][0])
+        assert client.get(self.url).status_code == 403
+
+    def test_anonymous_is_rejected(self, api_client, catalogue):
+        assert api_client.get(self.url).status_code == 401
+
+    def test_queries_per_chunk(self, admin_client, catalogue, monkeypatch,
+                               django_assert_num_queries):
+        from api.views import TitleViewSet
+
+        monkeypatch.setattr(TitleViewSet, 'export_chunk_size', 4)
+        # Три пачки по два запроса (произведения и жанры) и пустая пачка.
+        with django_assert_num_queries(3 * 2 + 1):
+            read_lines(admin_client.get(self.url))
@@ -0,0 +1,40 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestExportData:
+
+    def test_csv_round_trip(self, catalogue, tmp_path):
+        from reviews.models import (Category, Comment, Genre, Review, Title,
+                                    User)
+
+        call_command('exportdata', output_dir=str(tmp_path), gzip=True,
+                     chunk_size=2)
+        with gzip.open(tmp_path / 'genre_title.csv.gz', 'rt') as output:
+            assert output.readline().strip() == 'id,title_id,genre_id'
+
+        rating = Title.objects.get(pk=catalogue['titles'][0].pk).rating
+        counts = [model.objects.count() for model in (Title, Review, Comment)]
+        User.objects.all().delete()
+        Title.objects.all().delete()
+        Category.objects.all().delete()
+        Genre.objects.all().delete()
+
+        call_command('importcsv', data_dir=str(tmp_path))
+
+        assert [model.objects.count() for model in (
+            Title, Review, Comment)] == counts
+        assert Title.objects.get(
+            pk=catalogue['titles'][0].pk).rating == rating
+
+    def test_ndjson_since(self, catalogue, tmp_path):
+        call_command('exportdata', output_dir=str(tmp_path),
+                     format='ndjson', since='2100-01-01T00:00:00+00:00')
+        assert (tmp_path / 'review.ndjson').read_text() == ''
+        lines = (tmp_path / 'titles.ndjson').read_text().splitlines()
+        assert len(lines) == len(catalogue['titles'])
+        assert json.loads(lines[0])['name']
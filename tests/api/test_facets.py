@@ -0,0 +1,44 @@
+import pytest
+
+
+def counts(items, key='slug'):
+    return {item[key]: item['count'] for item in items}
+
+
+@pytest.mark.django_db
+class TestTitleFacets:
+    url = '/api/v1/titles/facets/'
+
+    def test_facets(self, api_client, catalogue, django_assert_num_queries):
+        with django_assert_num_queries(3):
+            response = api_client.get(self.url)
+        assert response.status_code == 200
+        data = response.json()
+        assert counts(data['genre']) == {
+            'genre-0': 10, 'genre-1': 7, 'genre-2': 4, 'genre-3': 2}
+        assert counts(data['category']) == {
+            'category-0': 4, 'category-1': 3, 'category-2': 3}
+        assert counts(data['year'], 'year') == {
+            title.year: 1 for title in catalogue['titles']}
+
+    def test_facets_follow_filters(self, api_client, catalogue):
+        data = api_client.get(f'{self.url}?genre=genre-3').json()
+        assert counts(data['genre']) == {
+            'genre-0': 2, 'genre-1': 2, 'genre-2': 2, 'genre-3': 2}
+        assert counts(data['category']) == {
+            'category-0': 1, 'category-1': 1, 'category-2': 0}
+
+    def test_year_buckets(self, api_client, catalogue):
+        data = api_client.get(f'{self.url}?year_bucket=5').json()
+        assert data['year'] == [
+            {'year': 2000, 'count': 5}, {'year': 2005, 'count': 5}]
+        response = api_client.get(f'{self.url}?year_bucket=0')
+        assert response.status_code == 400
+
+    def test_facets_are_cached(self, api_client, catalogue,
+                               django_assert_num_queries):
+        etag = api_client.get(self.url)['ETag']
+        with django_assert_num_queries(0):
+            assert api_client.get(self.url)['X-Cache'] == 'HIT'
+        response = api_client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
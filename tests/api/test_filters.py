@@ -0,0 +1,39 @@
+import pytest
+
+
+def count(api_client, query):
+    response = api_client.get(f'/api/v1/titles/?{query}')
+    assert response.status_code == 200
+    return response.json()['count']
+
+
+@pytest.mark.django_db
+class TestTitleFilters:
+
+    def test_genre_is_exact(self, api_client, catalogue):
+        assert count(api_client, 'genre=genre-3') == 2
+        assert count(api_client, 'genre=genre') == 0
+
+    def test_genre_any(self, api_client, catalogue):
+        assert count(api_client, 'genre=genre-2,genre-3') == 4
+
+    def test_genre_all(self, api_client, catalogue):
+        assert count(
+            api_client, 'genre=genre-2,genre-3&genre_match=all') == 2
+
+    def test_no_duplicate_titles(self, api_client, catalogue):
+        query = 'genre=genre-0,genre-1,genre-2,genre-3&page_size=100'
+        response = api_client.get(f'/api/v1/titles/?{query}')
+        ids = [title['id'] for title in response.json()['results']]
+        assert len(ids) == len(set(ids)) == len(catalogue['titles'])
+
+    def test_category_multi(self, api_client, catalogue):
+        assert count(api_client, 'category=category-0,category-1') == 7
+
+    def test_substring_is_opt_in(self, api_client, catalogue):
+        assert count(api_client, 'genre_contains=genre') == 10
+        assert count(api_client, 'category_contains=gory-2') == 3
+
+    def test_invalid_match(self, api_client, catalogue):
+        response = api_client.get('/api/v1/titles/?genre=a&genre_match=x')
+        assert response.status_code == 400
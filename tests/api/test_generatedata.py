@@ -0,0 +1,57 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+OPTIONS = (
+    '--users=20', '--categories=2', '--genres=3', '--titles=30',
+    '--reviews=200', '--comments=50', '--seed=7',
+    '--now=2024-01-31T12:00:00',
+)
+
+
+def snapshot():
+    from reviews.models import Comment, Review, Title
+
+    return (
+        list(Title.objects.order_by('pk').values_list('name', 'year')),
+        list(Review.objects.order_by('pk').values_list(
+            'title__name', 'score', 'pub_date')),
+        list(Comment.objects.order_by('pk').values_list('pub_date')),
+    )
+
+
+@pytest.mark.django_db
+class TestGenerateData:
+
+    def test_generatedata(self):
+        from reviews.models import (Category, Comment, Genre, Review, Title,
+                                    TitleStats, User)
+
+        call_command('generatedata', *OPTIONS)
+        assert User.objects.count() == 20
+        assert Category.objects.count() == 2
+        assert Genre.objects.count() == 3
+        assert Title.objects.count() == 30
+        assert Comment.objects.count() == 50
+        reviews = Review.objects.count()
+        assert 0 < reviews <= 200
+        per_title = sorted(
+            Title.objects.values_list('rating_count', flat=True),
+            reverse=True)
+        assert sum(per_title) == reviews
+        assert per_title[0] > 3 * reviews / 30
+        assert TitleStats.objects.count() == 30
+        assert not Title.objects.filter(genre=None).exists()
+
+    def test_generatedata_is_deterministic(self):
+        from reviews.models import Category, Genre, Title, User
+
+        call_command('generatedata', *OPTIONS)
+        first = snapshot()
+        for model in (Title, Category, Genre, User):
+            model.objects.all().delete()
+        call_command('generatedata', *OPTIONS)
+        assert snapshot() == first
+
+    def test_invalid_now(self):
+        with pytest.raises(CommandError):
+            call_command('generatedata', '--now=вчера')
@@ -0,0 +1,108 @@
+import pytest
+from django.core.management import call_command
+
+DATA = {
+    'users': 'id,username,email,role\n1,reader,reader@yamdb.fake,user\n'
+             '2,critic,critic@yamdb.fake,moderator\n',
+    'category': 'id,name,slug\n1,Фильм,movie\n2,Книга,book\n',
+    'genre': 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n',
+    'titles': 'id,name,year,category_id\n1,Первое,1990,1\n'
+              '2,Второе,2001,2\n3,Третье,2010,1\n',
+    'review': 'id,title_id,text,author_id,score\n1,1,"Хорошо,\n очень",1,8\n'
+              '2,1,Плохо,2,3\n3,2,Средне,1,5\n',
+    'comments': 'id,review_id,text,author_id\n1,1,Согласен,2\n',
+    'genre_title': 'id,title_id,genre_id\n1,1,1\n2,1,2\n3,2,2\n4,3,1\n',
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name, content in DATA.items():
+        (tmp_path / f'{name}.csv').write_text(content, encoding='utf-8')
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestImportCsv:
+
+    def test_import(self, data_dir):
+        from reviews.models import Comment, Review, Title, User
+
+        call_command('importcsv', data_dir=str(data_dir), batch_size=2)
+
+        assert User.objects.count() == 2
+        assert Review.objects.count() == 3
+        assert Comment.objects.count() == 1
+        assert Review.objects.get(pk=1).text == 'Хорошо,\n очень'
+        first = Title.objects.get(pk=1)
+        assert sorted(first.genre.values_list('slug', flat=True)) == [
+            'comedy', 'drama']
+        assert first.rating == 5
+        assert Title.objects.get(pk=3).rating is None
+
+    def test_import_resets_model_versions(self, data_dir):
+        from reviews.versions import get_versions
+
+        before = get_versions('review', 'comment')
+        call_command('importcsv', data_dir=str(data_dir))
+        after = get_versions('review', 'comment')
+        assert all(new > old for old, new in zip(before, after))
+
+    def test_import_is_atomic_per_file(self, data_dir):
+        from reviews.models import Genre, Title
+
+        (data_dir / 'titles.csv').write_text(
+            'id,name,year,category_id\n1,Первое,1990,1\n1,Дубль,1991,1\n',
+            encoding='utf-8')
+        with pytest.raises(Exception):
+            call_command('importcsv', data_dir=str(data_dir), batch_size=1)
+        assert Genre.objects.count() == 2
+        assert Title.objects.count() == 0
+
+    def test_import_with_workers(self, data_dir):
+        from reviews.models import Review, Title
+
+        call_command(
+            'importcsv', data_dir=str(data_dir), batch_size=1, workers=2)
+
+        assert Review.objects.count() == 3
+        assert Title.objects.get(pk=1).rating == 5
+
+    def test_invalid_row_is_reported(self, data_dir):
+        from django.core.management.base import CommandError
+
+        (data_dir / 'review.csv').write_text(
+            'id,title_id,text,author_id,score\n1,1,Ок,1,11\n',
+            encoding='utf-8')
+        with pytest.raises(CommandError, match='строка 2, поле score'):
+            call_command('importcsv', data_dir=str(data_dir))
+
+    @pytest.mark.parametrize('name, content, error', (
+        ('review.csv', 'id,title_id,text,author_id,score\n1,1,Ок,1,\n',
+         'строка 2, поле score'),
+        ('titles.csv', 'id,name,year,category_id\n1,Первое,1990,1\n'
+                       '2,Второе,,2\n', 'строка 3, поле year'),
+        ('review.csv', 'id,title_id,text,author_id,score\n1,1,,1,5\n',
+         'строка 2, поле text'),
+    ))
+    def test_empty_required_value_is_reported(self, data_dir, name, content,
+                                              error):
+        from django.core.management.base import CommandError
+
+        (data_dir / name).write_text(content, encoding='utf-8')
+        with pytest.raises(CommandError, match=error):
+            call_command('importcsv', data_dir=str(data_dir))
+
+    def test_empty_optional_values(self, data_dir):
+        from reviews.models import Title, User
+
+        (data_dir / 'users.csv').write_text(
+            'id,username,email,role,bio,password\n'
+            '1,reader,reader@yamdb.fake,user,,\n'
+            '2,critic,critic@yamdb.fake,moderator,,\n', encoding='utf-8')
+        (data_dir / 'titles.csv').write_text(
+            'id,name,year,category_id,description\n1,Первое,1990,1,\n'
+            '2,Второе,2001,2,\n3,Третье,2010,1,\n', encoding='utf-8')
+        call_command('importcsv', data_dir=str(data_dir))
+        assert User.objects.get(pk=1).bio == ''
+        assert Title.objects.get(pk=1).description is None
@@ -0,0 +1,108 @@
+import re
+
+import pytest
+
+
+def sample_value(text, sample):
+    match = re.search(rf'^{re.escape(sample)} (\S+)$', text, re.MULTILINE)
+    assert match, f'{sample} не найден в\n{text}'
+    return float(match.group(1))
+
+
+class TestMetricsStore:
+
+    def test_files_are_summed(self, metrics_dir):
+        from api.metrics import (MetricsFile, collect, record_request,
+                                 render_metrics, sample_key)
+
+        record_request('titles-list', 'GET', 200, 0.003, 0.001, 2)
+        record_request('titles-list', 'GET', 200, 0.2, 0.15, 4)
+        # Файл другого процесса.
+        other = MetricsFile(str(metrics_dir / 'metrics-1.db'))
+        other.increment_many([(sample_key(
+            'http_requests_total', 'http_requests_total',
+            route='titles-list', method='GET', status='200'), 3)])
+        other.close()
+
+        text = render_metrics(collect(str(metrics_dir)))
+        assert sample_value(
+            text, 'http_requests_total{method="GET",route="titles-list",'
+                  'status="200"}') == 5
+        assert sample_value(
+            text, 'http_request_duration_seconds_bucket{le="0.005",'
+                  'method="GET",route="titles-list"}') == 1
+        assert sample_value(
+            text, 'http_request_duration_seconds_bucket{le="0.25",'
+                  'method="GET",route="titles-list"}') == 2
+        assert sample_value(
+            text, 'http_request_duration_seconds_bucket{le="+Inf",'
+                  'method="GET",route="titles-list"}') == 2
+        assert sample_value(
+            text, 'http_request_db_duration_seconds_sum'
+                  '{route="titles-list"}') == pytest.approx(0.151)
+        assert sample_value(
+            text, 'http_request_db_queries_total{route="titles-list"}') == 6
+        assert '# TYPE http_request_duration_seconds histogram' in text
+
+    def test_file_grows_and_reopens(self, tmp_path):
+        from api.metrics import INITIAL_FILE_SIZE, MetricsFile, collect
+
+        path = str(tmp_path / 'metrics-2.db')
+        store = MetricsFile(path)
+        keys = [f'["family", "sample_{i}", []]' for i in range(5000)]
+        store.increment_many([(key, 1) for key in keys])
+        assert store.size > INITIAL_FILE_SIZE
+        store.close()
+
+        store = MetricsFile(path)
+        store.increment_many([(keys[0], 1)])
+        store.close()
+        totals = collect(str(tmp_path))
+        assert len(totals) == len(keys)
+        assert totals[keys[0]] == 2
+        assert totals[keys[-1]] == 1
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+
+    def test_requests_are_recorded_by_route(self, api_client, catalogue,
+                                            metrics_dir):
+        title = catalogue['titles'][0]
+        api_client.get('/api/v1/titles/')
+        api_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        api_client.get('/api/v1/titles/0/')
+        response = api_client.get('/metrics/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert sample_value(
+            text, 'http_requests_total{method="GET",route="titles-list",'
+                  'status="200"}') == 1
+        assert sample_value(
+            text, 'http_requests_total{method="GET",route="reviews-list",'
+                  'status="200"}') == 1
+        assert sample_value(
+            text, 'http_requests_total{method="GET",route="titles-detail",'
+                  'status="404"}') == 1
+        assert sample_value(
+            text, 'http_request_db_queries_total{route="reviews-list"}') > 0
+
+    def test_unmatched_route(self, api_client, metrics_dir):
+        api_client.get('/missing/')
+        text = api_client.get('/metrics/').content.decode()
+        assert sample_value(
+            text, 'http_requests_total{method="GET",route="unmatched",'
+                  'status="404"}') == 1
+
+    def test_unknown_method(self, api_client, metrics_dir):
+        api_client.generic('PROPFIND', '/api/v1/titles/')
+        api_client.generic('BREW', '/missing/')
+        text = api_client.get('/metrics/').content.decode()
+        assert sample_value(
+            text, 'http_requests_total{method="other",route="titles-list",'
+                  'status="401"}') == 1
+        assert sample_value(
+            text, 'http_requests_total{method="other",route="unmatched",'
+                  'status="404"}') == 1
+        assert 'PROPFIND' not in text
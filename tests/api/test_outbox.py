@@ -0,0 +1,63 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def test_signup_enqueues_email(self, api_client):
+        from reviews.models import OutgoingEmail
+
+        response = api_client.post('/api/v1/auth/signup/', {
+            'username': 'newbie', 'email': 'newbie@yamdb.fake'})
+        assert response.status_code == 200
+        assert mail.outbox == []
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == 'newbie@yamdb.fake'
+        assert email.status == OutgoingEmail.PENDING
+
+    def test_worker_sends_batch(self, api_client):
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import enqueue_email
+
+        for i in range(5):
+            enqueue_email('Тема', f'Текст {i}', f'user{i}@yamdb.fake')
+        call_command('sendemails', '--once', '--workers=1', '--batch-size=2')
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'user{i}@yamdb.fake' for i in range(5)]
+        assert set(OutgoingEmail.objects.values_list(
+            'status', flat=True)) == {OutgoingEmail.SENT}
+
+    def test_claimed_emails_are_skipped(self):
+        from reviews.outbox import claim_batch, enqueue_email
+
+        enqueue_email('Тема', 'Текст', 'user@yamdb.fake')
+        assert len(claim_batch(10)) == 1
+        assert claim_batch(10) == []
+
+    def test_failed_send_is_retried_with_backoff(self, monkeypatch,
+                                                 settings):
+        from django.core.mail import EmailMessage
+        from django.utils import timezone
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import claim_batch, deliver, enqueue_email
+
+        def broken_send(self, fail_silently=False):
+            raise ConnectionError('SMTP недоступен')
+
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        email = enqueue_email('Тема', 'Текст', 'user@yamdb.fake')
+        monkeypatch.setattr(EmailMessage, 'send', broken_send)
+        assert deliver(claim_batch(10)) == (0, 1)
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.PENDING
+        assert email.attempts == 1
+        assert email.next_attempt_at > timezone.now()
+        assert claim_batch(10) == []
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        assert deliver(claim_batch(10)) == (0, 1)
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.FAILED
+        assert 'SMTP' in email.last_error
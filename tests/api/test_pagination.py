@@ -0,0 +1,96 @@
+import base64
+import json
+
+import pytest
+
+
+def walk(api_client, url, link='next'):
+    items = []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что пагинация по курсору не выполняет COUNT'
+        )
+        items.extend(data['results'])
+        url = data[link]
+    return items
+
+
+def encode_cursor(position, reverse=0):
+    cursor = json.dumps({'p': position, 'r': reverse})
+    return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_titles_walk_forward(self, api_client, catalogue):
+        items = walk(api_client, '/api/v1/titles/?pagination=cursor&page_size=3')
+        expected = sorted(
+            (title.name, title.id) for title in catalogue['titles'])
+        assert [(item['name'], item['id']) for item in items] == expected
+
+    def test_titles_walk_backward(self, api_client, catalogue):
+        response = api_client.get(
+            '/api/v1/titles/?pagination=cursor&page_size=4')
+        first_page = response.json()['results']
+        second = api_client.get(response.json()['next']).json()
+        previous = api_client.get(second['previous']).json()
+        assert previous['results'] == first_page
+        assert previous['previous'] is None
+
+    def test_reviews_walk(self, api_client, catalogue):
+        title = catalogue['titles'][0]
+        items = walk(
+            api_client,
+            f'/api/v1/titles/{title.id}/reviews/?pagination=cursor&page_size=2'
+        )
+        assert [item['id'] for item in items] == [
+            review.id for review in catalogue['reviews']]
+
+    def test_page_size_is_capped(self, api_client, catalogue):
+        response = api_client.get(
+            '/api/v1/titles/?pagination=cursor&page_size=100000')
+        assert len(response.json()['results']) == len(catalogue['titles'])
+
+    def test_invalid_cursor(self, api_client, catalogue):
+        response = api_client.get('/api/v1/titles/?cursor=broken')
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize('position', (
+        ['a', 'abc'],
+        ['a', None],
+        ['a', [1]],
+        [['a'], {'b': 1}],
+    ))
+    def test_cursor_with_invalid_values(self, api_client, catalogue,
+                                        position):
+        response = api_client.get(
+            f'/api/v1/titles/?cursor={encode_cursor(position)}')
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize('position', (
+        ['not-a-date', 1],
+        [[2020], 1],
+        ['2022-01-01T00:00:00+00:00', 'abc'],
+    ))
+    def test_review_cursor_with_invalid_values(self, api_client, catalogue,
+                                               position):
+        title = catalogue['titles'][0]
+        response = api_client.get(
+            f'/api/v1/titles/{title.id}/reviews/'
+            f'?cursor={encode_cursor(position)}')
+        assert response.status_code == 404
+
+    def test_cursor_page_queries(self, api_client, catalogue,
+                                 django_assert_num_queries):
+        response = api_client.get(
+            '/api/v1/titles/?pagination=cursor&page_size=3')
+        with django_assert_num_queries(2):
+            api_client.get(response.json()['next'])
+
+    def test_page_number_is_default(self, api_client, catalogue):
+        response = api_client.get('/api/v1/titles/')
+        assert response.json()['count'] == len(catalogue['titles'])
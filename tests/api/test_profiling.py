@@ -0,0 +1,95 @@
+import pstats
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+@pytest.fixture
+def profiles_dir(settings, tmp_path):
+    settings.PROFILING_DIR = str(tmp_path)
+    return tmp_path
+
+
+def jwt_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+@pytest.mark.django_db
+class TestProfiling:
+
+    def test_admin_header(self, catalogue, profiles_dir):
+        from reviews.models import User
+
+        admin = User.objects.create(
+            username='admin', email='admin@yamdb.fake', role=User.ADMIN)
+        response = jwt_client(admin).get(
+            '/api/v1/titles/', HTTP_X_PROFILE='1')
+        assert response.status_code == 200
+        filename = response['X-Profile-File']
+        assert '-titles-list-GET-' in filename
+        assert filename.endswith('.prof')
+        assert [path.name for path in profiles_dir.iterdir()] == [filename]
+        stats = pstats.Stats(str(profiles_dir / filename))
+        assert stats.total_calls > 0
+
+    def test_admin_query_flag_sampling_mode(self, catalogue, profiles_dir,
+                                            settings):
+        from reviews.models import User
+
+        settings.PROFILING_MODE = 'sampling'
+        settings.PROFILING_SAMPLING_INTERVAL = 0.0001
+        admin = User.objects.create(
+            username='admin', email='admin@yamdb.fake', role=User.ADMIN)
+        title = catalogue['titles'][0]
+        response = jwt_client(admin).get(
+            f'/api/v1/titles/{title.id}/reviews/?profile=1')
+        assert response.status_code == 200
+        filename = response['X-Profile-File']
+        assert '-reviews-list-GET-' in filename
+        assert filename.endswith('.collapsed')
+        lines = (profiles_dir / filename).read_text().splitlines()
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            assert int(count) > 0
+            assert stack
+
+    @pytest.mark.parametrize('role', ('user', 'moderator', None))
+    def test_not_admin(self, api_client, catalogue, profiles_dir, role):
+        from reviews.models import User
+
+        client = api_client
+        if role is not None:
+            user = User.objects.create(
+                username='user', email='user@yamdb.fake', role=role)
+            client = jwt_client(user)
+        response = client.get('/api/v1/titles/?profile=1',
+                              HTTP_X_PROFILE='1')
+        assert response.status_code == 200
+        assert 'X-Profile-File' not in response
+        assert not list(profiles_dir.iterdir())
+
+    def test_route_sampling(self, api_client, catalogue, profiles_dir,
+                            settings):
+        settings.PROFILING_ROUTE_SAMPLE_RATES = {'titles-list': 1.0}
+        title = catalogue['titles'][0]
+        api_client.get('/api/v1/titles/')
+        api_client.get(f'/api/v1/titles/{title.id}/')
+        response = api_client.get('/api/v1/titles/')
+        assert 'X-Profile-File' not in response
+        names = [path.name for path in profiles_dir.iterdir()]
+        assert len(names) == 2
+        assert all('-titles-list-GET-' in name for name in names)
+
+    def test_default_sample_rate(self, api_client, catalogue, profiles_dir,
+                                 settings):
+        settings.PROFILING_SAMPLE_RATE = 1.0
+        settings.PROFILING_ROUTE_SAMPLE_RATES = {'titles-list': 0.0}
+        api_client.get('/api/v1/titles/')
+        api_client.get('/api/v1/genres/')
+        names = [path.name for path in profiles_dir.iterdir()]
+        assert len(names) == 1
+        assert '-genres-list-GET-' in names[0]
@@ -0,0 +1,85 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('url, budget', (
+        ('/api/v1/categories/', 2),
+        ('/api/v1/genres/', 2),
+        ('/api/v1/titles/', 3),
+        ('/api/v1/titles/?genre=genre-1', 3),
+    ))
+    def test_catalogue_lists(self, api_client, catalogue, url, budget,
+                             django_assert_max_num_queries):
+        with django_assert_max_num_queries(budget):
+            response = api_client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к {url} возвращает статус 200'
+        )
+
+    def test_title_detail(self, api_client, catalogue,
+                          django_assert_max_num_queries):
+        title = catalogue['titles'][3]
+        with django_assert_max_num_queries(2):
+            response = api_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == title.genre.count()
+
+    def test_reviews_list(self, api_client, catalogue,
+                          django_assert_max_num_queries):
+        title = catalogue['titles'][0]
+        with django_assert_max_num_queries(3):
+            response = api_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.status_code == 200
+        assert response.json()['count'] == len(catalogue['reviews'])
+
+    def test_comments_list(self, api_client, catalogue,
+                           django_assert_max_num_queries):
+        review = catalogue['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        with django_assert_max_num_queries(3):
+            response = api_client.get(url)
+        assert response.status_code == 200
+
+    def test_list_queries_do_not_grow_with_page(self, api_client, catalogue,
+                                                django_assert_num_queries):
+        with django_assert_num_queries(3):
+            api_client.get('/api/v1/titles/?page=1')
+        with django_assert_num_queries(3):
+            api_client.get('/api/v1/titles/?page=2')
+
+    def test_rating_is_stored(self, api_client, catalogue):
+        title = catalogue['titles'][0]
+        response = api_client.get(f'/api/v1/titles/{title.id}/')
+        scores = [review.score for review in catalogue['reviews']]
+        assert response.json()['rating'] == sum(scores) // len(scores)
+
+    def test_review_create(self, catalogue):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(catalogue['users'][0])
+        url = f'/api/v1/titles/{catalogue["titles"][1].id}/reviews/'
+        # Произведение, вставка отзыва, обновление рейтинга и статистики.
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(url, {'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 201
+        assert len([
+            query for query in context.captured_queries
+            if 'SAVEPOINT' not in query['sql']
+        ]) == 4
+
+    def test_duplicate_review(self, catalogue):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(catalogue['users'][0])
+        url = f'/api/v1/titles/{catalogue["titles"][0].id}/reviews/'
+        response = client.post(url, {'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 400
+        assert 'non_field_errors' in response.json()
+        assert catalogue['titles'][0].reviews.count() == len(
+            catalogue['reviews'])
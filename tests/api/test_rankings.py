@@ -0,0 +1,92 @@
+import datetime
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+
+def test_top_per_group():
+    from reviews.rankings import top_per_group
+
+    groups = np.array([1, 0, 1, 0, 1, 0])
+    title_ids = np.array([10, 11, 12, 13, 14, 15])
+    scores = np.array([5.0, 1.0, 7.0, 3.0, 7.0, 2.0])
+    order, positions = top_per_group(groups, title_ids, scores, 2)
+    assert title_ids[order].tolist() == [13, 15, 12, 14]
+    assert positions.tolist() == [1, 2, 1, 2]
+
+
+def test_bayesian_scores_pull_small_samples_to_mean():
+    from reviews.rankings import bayesian_scores
+
+    scores = bayesian_scores(
+        np.array([10.0, 90.0, 0.0]), np.array([1.0, 10.0, 0.0]))
+    mean = 100 / 11
+    assert mean < scores[0] < 10
+    assert mean - scores[1] < mean - 9
+    assert scores[2] == pytest.approx(mean)
+
+
+@pytest.fixture
+def ranked(catalogue):
+    from reviews.models import Review
+
+    titles = catalogue['titles']
+    users = catalogue['users']
+    Review.objects.create(
+        title=titles[1], author=users[0], text='Отзыв', score=10)
+    for user in users:
+        Review.objects.create(
+            title=titles[2], author=user, text='Отзыв', score=9)
+    Review.objects.filter(title=titles[0]).update(
+        pub_date=timezone.now() - datetime.timedelta(days=10))
+    call_command('rebuildrankings')
+    return catalogue
+
+
+def names(response):
+    return [item['title']['name'] for item in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestRankings:
+
+    def test_top_rated(self, api_client, ranked,
+                       django_assert_max_num_queries):
+        with django_assert_max_num_queries(3):
+            response = api_client.get('/api/v1/titles/top-rated/')
+        assert response.status_code == 200
+        assert names(response) == [
+            'Произведение 2', 'Произведение 1', 'Произведение 0']
+        assert response.json()['results'][0]['position'] == 1
+
+    def test_trending(self, api_client, ranked):
+        response = api_client.get('/api/v1/titles/trending/')
+        assert names(response) == [
+            'Произведение 2', 'Произведение 0', 'Произведение 1']
+
+    def test_scoped_lists(self, api_client, ranked):
+        url = '/api/v1/titles/top-rated/'
+        assert names(api_client.get(f'{url}?genre=genre-1')) == [
+            'Произведение 2', 'Произведение 1']
+        assert names(api_client.get(f'{url}?category=category-0')) == [
+            'Произведение 0']
+        assert names(api_client.get(f'{url}?genre=missing')) == []
+        response = api_client.get(f'{url}?genre=genre-1&category=category-0')
+        assert response.status_code == 400
+
+    def test_cursor_pagination(self, api_client, ranked):
+        response = api_client.get(
+            '/api/v1/titles/top-rated/?pagination=cursor&page_size=2')
+        assert names(response) == ['Произведение 2', 'Произведение 1']
+        response = api_client.get(response.json()['next'])
+        assert names(response) == ['Произведение 0']
+
+    def test_limit(self, ranked):
+        from reviews.models import TitleRanking
+        from reviews.rankings import rebuild_rankings
+
+        rebuild_rankings(limit=1)
+        assert TitleRanking.objects.filter(
+            scope=TitleRanking.OVERALL_SCOPE).count() == 2
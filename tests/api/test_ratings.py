@@ -0,0 +1,130 @@
+import pytest
+
+
+def rating_of(title):
+    title.refresh_from_db()
+    return title.rating_sum, title.rating_count
+
+
+@pytest.mark.django_db
+class TestRatingSignals:
+
+    def test_create(self, catalogue):
+        title = catalogue['titles'][0]
+        assert rating_of(title) == (15, 5)
+
+    def test_score_change(self, catalogue):
+        title = catalogue['titles'][0]
+        review = catalogue['reviews'][0]
+        review.score = 10
+        review.save()
+        assert rating_of(title) == (24, 5)
+        assert title.rating == 4
+
+    def test_delete(self, catalogue):
+        title = catalogue['titles'][0]
+        catalogue['reviews'][4].delete()
+        assert rating_of(title) == (10, 4)
+
+    def test_queryset_delete(self, catalogue):
+        from reviews.models import Review
+
+        title = catalogue['titles'][0]
+        Review.objects.filter(score__gte=4).delete()
+        assert rating_of(title) == (6, 3)
+
+    def test_move_to_another_title(self, catalogue):
+        old_title, new_title = catalogue['titles'][:2]
+        review = catalogue['reviews'][2]
+        review.title = new_title
+        review.save()
+        assert rating_of(old_title) == (12, 4)
+        assert rating_of(new_title) == (3, 1)
+
+    def test_move_and_change_score(self, catalogue):
+        from reviews.models import Review
+
+        old_title, new_title = catalogue['titles'][:2]
+        review = Review.objects.get(pk=catalogue['reviews'][1].pk)
+        review.title = new_title
+        review.score = 9
+        review.save()
+        assert rating_of(old_title) == (13, 4)
+        assert rating_of(new_title) == (9, 1)
+
+    def test_last_review_deleted(self, catalogue):
+        from reviews.models import Review
+
+        title = catalogue['titles'][0]
+        Review.objects.filter(title=title).delete()
+        assert rating_of(title) == (0, 0)
+        assert title.rating is None
+
+
+def updates_of(queries, table):
+    return [
+        query for query in queries.captured_queries
+        if query['sql'].startswith(f'UPDATE "{table}"')
+    ]
+
+
+@pytest.mark.django_db
+class TestGroupedDelete:
+
+    def test_one_update_per_title(self, catalogue):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Review, TitleStats
+
+        title = catalogue['titles'][0]
+        with CaptureQueriesContext(connection) as queries:
+            Review.objects.filter(score__lte=3).delete()
+        assert len(updates_of(queries, 'reviews_title')) == 1
+        assert len(updates_of(queries, 'reviews_titlestats')) == 1
+        assert rating_of(title) == (9, 2)
+        stats = TitleStats.objects.get(title=title)
+        assert (stats.review_count, stats.score_1, stats.score_4) == (2, 0, 1)
+        assert stats.latest_review_at == catalogue['reviews'][4].pub_date
+
+    def test_deleted_title_is_not_updated(self, catalogue):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Review, User
+
+        title = catalogue['titles'][0]
+        for user in catalogue['users']:
+            Review.objects.create(
+                title=catalogue['titles'][1], author=user, text='Ок', score=6)
+        with CaptureQueriesContext(connection) as queries:
+            title.delete()
+        assert not updates_of(queries, 'reviews_title')
+        assert not updates_of(queries, 'reviews_titlestats')
+        assert len(queries) < 20
+
+        with CaptureQueriesContext(connection) as queries:
+            User.objects.filter(
+                pk__in=[user.pk for user in catalogue['users'][:3]]).delete()
+        assert len(updates_of(queries, 'reviews_title')) == 1
+        assert rating_of(catalogue['titles'][1]) == (12, 2)
+
+    def test_drifted_counters_are_clamped(self, catalogue):
+        from reviews.models import Title, TitleStats
+
+        title = catalogue['titles'][0]
+        Title.objects.filter(pk=title.pk).update(rating_sum=2, rating_count=0)
+        TitleStats.objects.filter(title=title).update(
+            review_count=0, score_5=0)
+        catalogue['reviews'][4].delete()
+        assert rating_of(title) == (0, 0)
+        stats = TitleStats.objects.get(title=title)
+        assert (stats.review_count, stats.score_5) == (0, 0)
+
+    def test_interrupted_delete_is_not_counted(self, catalogue):
+        from reviews import signals
+
+        title = catalogue['titles'][0]
+        review = catalogue['reviews'][0]
+        signals.load_rating_before_delete(None, review)
+        catalogue['reviews'][1].delete()
+        assert rating_of(title) == (13, 4)
+        assert not signals._pending().reviews
@@ -0,0 +1,97 @@
+import json
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+TIMING_PATTERN = re.compile(
+    r'db;dur=(\d+\.\d+);desc="(\d+) queries", app;dur=(\d+\.\d+), '
+    r'serialize;dur=(\d+\.\d+), render;dur=(\d+\.\d+), '
+    r'total;dur=(\d+\.\d+)'
+)
+
+
+@pytest.mark.django_db
+class TestRequestTiming:
+
+    def test_server_timing(self, api_client, catalogue):
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        match = TIMING_PATTERN.fullmatch(response['Server-Timing'])
+        assert match, response['Server-Timing']
+        db, queries_count, app, serialize, render, total = match.groups()
+        assert int(queries_count) == len(queries)
+        assert float(serialize) > 0
+        assert float(db) + float(app) + float(serialize) + float(
+            render) == pytest.approx(float(total), abs=0.05)
+
+    def test_serialization_is_timed_once(self, api_client, catalogue,
+                                         monkeypatch):
+        from api import middleware
+
+        calls = []
+        serialization = middleware.RequestTiming.serialization
+
+        def counted(timing):
+            calls.append(timing.serializing)
+            return serialization(timing)
+
+        monkeypatch.setattr(
+            middleware.RequestTiming, 'serialization', counted)
+        api_client.get(f'/api/v1/titles/{catalogue["titles"][0].id}/')
+        assert calls == [False]
+
+    def test_drf_serializers_are_not_patched(self, api_client, catalogue):
+        from rest_framework.serializers import BaseSerializer
+
+        api_client.get('/api/v1/titles/')
+        assert BaseSerializer.data.fget.__module__ == (
+            'rest_framework.serializers')
+
+    def test_custom_action_serialization(self, api_client, catalogue):
+        response = api_client.get(
+            f'/api/v1/titles/{catalogue["titles"][0].id}/stats/')
+        match = TIMING_PATTERN.fullmatch(response['Server-Timing'])
+        assert float(match.group(4)) > 0
+
+    def test_streaming_response(self, admin_client, catalogue):
+        response = admin_client.get('/api/v1/titles/export/')
+        assert response.streaming
+        assert re.fullmatch(
+            r'total;dur=\d+\.\d+;desc="before streaming"',
+            response['Server-Timing'])
+
+    def test_fast_request_is_not_logged(self, api_client, catalogue, caplog):
+        api_client.get('/api/v1/titles/')
+        assert not [
+            record for record in caplog.records
+            if record.name == 'api.slow_requests'
+        ]
+
+    def test_slow_request_log(self, api_client, catalogue, caplog, settings):
+        settings.SLOW_REQUEST_THRESHOLD = 0
+        settings.SLOW_REQUEST_TOP_QUERIES = 2
+        title = catalogue['titles'][0]
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = api_client.get(url)
+        records = [
+            record for record in caplog.records
+            if record.name == 'api.slow_requests'
+        ]
+        assert len(records) == 1
+        entry = json.loads(records[0].getMessage())
+        assert entry['method'] == 'GET'
+        assert entry['path'] == url
+        assert entry['route'] == 'reviews-list'
+        assert entry['status'] == response.status_code
+        assert entry['total_ms'] >= entry['db_ms']
+        assert entry['serialize_ms'] > 0
+        assert entry['streaming'] is False
+        assert 0 < len(entry['top_queries']) <= 2
+        assert sum(
+            query['count'] for query in entry['top_queries']
+        ) <= entry['queries']
+        counts = [query['count'] for query in entry['top_queries']]
+        assert counts == sorted(counts, reverse=True)
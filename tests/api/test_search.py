@@ -0,0 +1,90 @@
+import pytest
+
+
+@pytest.fixture
+def library(catalogue):
+    from reviews.models import Title
+
+    category = catalogue['categories'][0]
+    return {
+        name: Title.objects.create(name=name, year=1900, category=category)
+        for name in ('Война и мир', 'Мир Дикого Запада', 'Война миров')
+    }
+
+
+def names(response):
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_ranked_results(self, api_client, library):
+        response = api_client.get('/api/v1/titles/?search=мир')
+        assert names(response) == [
+            'Война и мир', 'Мир Дикого Запада', 'Война миров']
+
+    def test_all_words_must_match(self, api_client, library):
+        response = api_client.get('/api/v1/titles/?search=война мир')
+        assert names(response) == ['Война и мир', 'Война миров']
+
+    def test_index_follows_new_titles(self, api_client, library, catalogue,
+                                      django_capture_on_commit_callbacks):
+        from reviews.models import Title
+
+        api_client.get('/api/v1/titles/?search=мир')
+        with django_capture_on_commit_callbacks(execute=True):
+            Title.objects.create(name='Мир', year=2000,
+                                 category=catalogue['categories'][0])
+        response = api_client.get('/api/v1/titles/?search=мир')
+        assert 'Мир' in names(response)
+
+    def test_no_matches(self, api_client, library):
+        response = api_client.get('/api/v1/titles/?search=антимир')
+        assert response.json()['count'] == 0
+
+    def test_search_combines_with_filters(self, api_client, library):
+        response = api_client.get('/api/v1/titles/?search=мир&year=2000')
+        assert names(response) == []
+
+    @pytest.mark.parametrize('query', (
+        'search=мир&pagination=cursor',
+        'search=мир&cursor=eyJwIjogWyJhIiwgMV0sICJyIjogMH0=',
+    ))
+    def test_cursor_pagination_is_rejected(self, api_client, library, query):
+        response = api_client.get(f'/api/v1/titles/?{query}')
+        assert response.status_code == 400
+        assert 'search' in response.json()
+
+    def test_page_number_pagination_keeps_rank(self, api_client, library):
+        response = api_client.get(
+            '/api/v1/titles/', {'search': 'мир', 'page_size': 2})
+        assert names(response) == ['Война и мир', 'Мир Дикого Запада']
+        response = api_client.get(response.json()['next'])
+        assert names(response) == ['Война миров']
+
+    def test_index_follows_renames_and_deletes(self, api_client, library):
+        library['Война миров'].delete()
+        title = library['Мир Дикого Запада']
+        title.name = 'Дикий Запад'
+        title.save()
+        response = api_client.get('/api/v1/titles/?search=мир')
+        assert names(response) == ['Война и мир']
+
+    def test_page_is_ranked_in_sql(self, api_client, library):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(
+                '/api/v1/titles/', {'search': 'мир', 'page_size': 1})
+        assert names(response) == ['Война и мир']
+        sql = ' '.join(query['sql'] for query in queries)
+        assert 'bm25' in sql
+        assert 'CASE' not in sql
+
+    def test_facets_follow_search(self, api_client, library):
+        response = api_client.get(
+            '/api/v1/titles/facets/', {'search': 'война'})
+        assert response.status_code == 200
+        assert response.json()['year'] == [{'year': 1900, 'count': 2}]
@@ -0,0 +1,75 @@
+import pytest
+from django.core.management import call_command
+from django.utils.dateparse import parse_datetime
+
+
+def histogram(data):
+    return {item['score']: item['count'] for item in data['histogram']
+            if item['count']}
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def url(self, title_id):
+        return f'/api/v1/titles/{title_id}/stats/'
+
+    def test_stats(self, api_client, catalogue, django_assert_num_queries):
+        title = catalogue['titles'][0]
+        with django_assert_num_queries(1):
+            response = api_client.get(self.url(title.id))
+        assert response.status_code == 200
+        data = response.json()
+        assert data['review_count'] == 5
+        assert histogram(data) == {1: 1, 2: 1, 3: 1, 4: 1, 5: 1}
+        assert len(data['histogram']) == 10
+        latest = max(review.pub_date for review in catalogue['reviews'])
+        assert parse_datetime(data['latest_review_at']) == latest
+
+    def test_empty_title(self, api_client, catalogue):
+        data = api_client.get(self.url(catalogue['titles'][1].id)).json()
+        assert data['review_count'] == 0
+        assert data['latest_review_at'] is None
+        assert histogram(data) == {}
+
+    def test_unknown_title(self, api_client, catalogue):
+        assert api_client.get(self.url(0)).status_code == 404
+        assert api_client.get(self.url('abc')).status_code == 404
+
+    def test_stats_follow_reviews(self, catalogue):
+        from reviews.models import TitleStats
+
+        title = catalogue['titles'][0]
+        reviews = catalogue['reviews']
+        reviews[0].score = 10
+        reviews[0].save()
+        reviews[4].delete()
+        reviews[1].title = catalogue['titles'][1]
+        reviews[1].save()
+        stats = TitleStats.objects.get(title=title)
+        assert stats.review_count == 3
+        assert (stats.score_1, stats.score_2, stats.score_5) == (0, 0, 0)
+        assert (stats.score_3, stats.score_4, stats.score_10) == (1, 1, 1)
+        assert stats.latest_review_at == reviews[3].pub_date
+        moved = TitleStats.objects.get(title=catalogue['titles'][1])
+        assert (moved.review_count, moved.score_2) == (1, 1)
+
+    def test_missing_row_is_rebuilt(self, catalogue):
+        from reviews.models import Review, TitleStats
+
+        title = catalogue['titles'][2]
+        TitleStats.objects.filter(title=title).delete()
+        Review.objects.create(
+            title=title, author=catalogue['users'][0], text='Отзыв', score=7)
+        stats = TitleStats.objects.get(title=title)
+        assert (stats.review_count, stats.score_7) == (1, 1)
+
+    def test_rebuild_command(self, catalogue):
+        from reviews.models import TitleStats
+
+        TitleStats.objects.update(review_count=100, score_1=100)
+        TitleStats.objects.filter(title=catalogue['titles'][3]).delete()
+        call_command('rebuildstats')
+        stats = TitleStats.objects.get(title=catalogue['titles'][0])
+        assert (stats.review_count, stats.score_1) == (5, 1)
+        assert TitleStats.objects.count() == len(catalogue['titles'])
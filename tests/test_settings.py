@@ -6,6 +6,6 @@ class TestSettings:
     def test_settings(self):
 
         assert not settings.DEBUG, 'Проверьте, что DEBUG в настройках Django выключен'
-        assert settings.DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql', (
+        assert settings.DATABASES['default']['ENGINE'] == 'api_yamdb.db.postgresql', (
             'Проверьте, что используете базу данных postgresql'
         )